@@ -27,6 +27,7 @@ from sources.logger import Logger
 from sources.schemas import QueryRequest, QueryResponse
 from sources.workspace_manager import WorkspaceManager
 from sources.realtime import ws_manager
+from sources.persistent_memory import ts_to_iso
 from pydantic import BaseModel
 
 class ModelConfigUpdate(BaseModel):
@@ -196,7 +197,7 @@ async def websocket_endpoint(websocket: WebSocket):
             try:
                 msg = json.loads(data)
                 if msg.get("type") == "ping":
-                    await websocket.send_text(json.dumps({"type": "pong", "timestamp": time.time()}))
+                    await websocket.send_text(json.dumps({"type": "pong", "timestamp": time.time_ns() // 1_000_000}))
             except json.JSONDecodeError:
                 pass
     except WebSocketDisconnect:
@@ -738,11 +739,15 @@ async def memory_stats():
     if interaction is None:
         return JSONResponse(status_code=503, content={"error": "System not initialized"})
     pm = interaction.persistent_memory
+    recent_projects = [
+        {**project, "created_at": ts_to_iso(project.get("created_at"))}
+        for project in pm.get_recent_projects(5)
+    ]
     return JSONResponse(status_code=200, content={
         "facts_count": len(pm.facts),
         "skills_count": len(pm.skills),
         "preferences": pm.get_preferences(),
-        "recent_projects": pm.get_recent_projects(5),
+        "recent_projects": recent_projects,
     })
 
 
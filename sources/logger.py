@@ -2,6 +2,42 @@ import os, sys
 from typing import List, Tuple, Type, Dict
 import datetime
 import logging
+import logging.handlers
+import queue
+import atexit
+import threading
+
+# Records from every Logger go through one queue; a single background listener thread
+# writes them to the per-file handler so callers never block on disk I/O.
+_log_queue = queue.Queue(-1)
+_file_handlers: Dict[str, logging.Handler] = {}
+_listener = None
+_listener_lock = threading.Lock()
+
+
+class _RoutingHandler(logging.Handler):
+    """Forward each record to the file handler registered for its logger name."""
+    def emit(self, record):
+        handler = _file_handlers.get(record.name)
+        if handler is not None:
+            handler.handle(record)
+
+
+def _stop_listener():
+    if _listener is not None:
+        _listener.stop()
+    for handler in _file_handlers.values():
+        handler.close()
+
+
+def _ensure_listener():
+    global _listener
+    with _listener_lock:
+        if _listener is None:
+            _listener = logging.handlers.QueueListener(_log_queue, _RoutingHandler())
+            _listener.start()
+            atexit.register(_stop_listener)
+
 
 class Logger:
     def __init__(self, log_filename):
@@ -19,10 +55,13 @@ class Logger:
         self.logger.setLevel(logging.DEBUG)
         self.logger.handlers.clear()
         self.logger.propagate = False
-        file_handler = logging.FileHandler(self.log_path)
-        formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-        file_handler.setFormatter(formatter)
-        self.logger.addHandler(file_handler)
+        if log_filename not in _file_handlers:
+            file_handler = logging.FileHandler(self.log_path)
+            formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+            file_handler.setFormatter(formatter)
+            _file_handlers[log_filename] = file_handler
+        self.logger.addHandler(logging.handlers.QueueHandler(_log_queue))
+        _ensure_listener()
 
     
     def create_folder(self, path):
@@ -2,12 +2,69 @@ import asyncio
 import re
 import time
 import json
-from typing import List, Dict, Optional, Tuple
+from typing import List, Dict, Optional, Set, Tuple
 from dataclasses import dataclass, field
 from sources.logger import Logger
 from sources.utility import pretty_print, animate_thinking
 from sources.persistent_memory import PersistentMemory
 
+_RECOVERY_PATTERN = re.compile(
+    r"(?P<dependency>no module named(?: ['\"]?(?P<module>\w+))?|import)"
+    r"|(?P<permission>permission|access denied)"
+    r"|(?P<syntax>syntax)"
+    r"|(?P<network>timeout|connection)"
+)
+
+# Checked in priority order; an agent of None keeps the failed step's agent.
+_RECOVERY_STRATEGIES = {
+    "dependency": (
+        None,
+        "[RECOVERY - INSTALL DEPENDENCY] "
+        "Install dependency '{module}' terlebih dahulu menggunakan pip install, "
+        "lalu ulangi tugas: {description}",
+    ),
+    "permission": (
+        "file",
+        "[RECOVERY - FIX PERMISSIONS] "
+        "Perbaiki permission/akses file yang bermasalah, "
+        "lalu ulangi tugas: {description}",
+    ),
+    "syntax": (
+        "coder",
+        "[RECOVERY - FIX SYNTAX] "
+        "Perbaiki syntax error dalam kode. "
+        "Baca file yang bermasalah, identifikasi error syntax, dan perbaiki. "
+        "Tugas asli: {description}",
+    ),
+    "network": (
+        "web",
+        "[RECOVERY - RETRY CONNECTION] "
+        "Coba lagi dengan query pencarian berbeda atau URL alternatif. "
+        "Tugas asli: {description}",
+    ),
+}
+
+_FILE_PATH_PATTERN = re.compile(r'(?:/home/runner/workspace/[^\s\'"]+|\.\/[^\s\'"]+|work(?:_dir)?/[^\s\'"]+)')
+_URL_PATTERN = re.compile(r'https?://[^\s\'"<>]+')
+
+
+def _collect_unique(pattern: re.Pattern, text: str, seen: Set[str], unique: List[str], limit: Optional[int] = None):
+    for match in pattern.finditer(text):
+        if limit is not None and len(unique) >= limit:
+            return
+        value = match.group(0)
+        if value not in seen:
+            seen.add(value)
+            unique.append(value)
+
+
+_ALTERNATIVE_AGENTS = {
+    "coder": "file",
+    "file": "coder",
+    "web": "casual",
+    "casual": "coder",
+}
+
 
 @dataclass
 class TaskStep:
@@ -30,24 +87,37 @@ class ExecutionPlan:
     completed: bool = False
     reflection_log: List[str] = field(default_factory=list)
     start_time: float = 0.0
+    _status_counts: Dict[str, int] = field(default_factory=dict, init=False, repr=False)
 
-    def get_next_step(self) -> Optional[TaskStep]:
+    def __post_init__(self):
         for step in self.steps:
-            if step.status == "pending":
-                deps_met = True
-                for dep_id in step.dependencies:
-                    dep_step = next((s for s in self.steps if str(s.id) == str(dep_id)), None)
-                    if dep_step and dep_step.status != "completed":
-                        deps_met = False
-                        break
-                if deps_met:
-                    return step
-        return None
+            self._status_counts[step.status] = self._status_counts.get(step.status, 0) + 1
+
+    def add_step(self, step: TaskStep):
+        self.steps.append(step)
+        self._status_counts[step.status] = self._status_counts.get(step.status, 0) + 1
+
+    def set_status(self, step: TaskStep, status: str):
+        self._status_counts[step.status] -= 1
+        self._status_counts[status] = self._status_counts.get(status, 0) + 1
+        step.status = status
+
+    def count(self, status: str) -> int:
+        return self._status_counts.get(status, 0)
+
+    def get_ready_steps(self) -> List[TaskStep]:
+        completed_ids = {str(s.id) for s in self.steps if s.status == "completed"}
+        known_ids = {str(s.id) for s in self.steps}
+        return [
+            step for step in self.steps
+            if step.status == "pending"
+            and all(str(dep) in completed_ids or str(dep) not in known_ids for dep in step.dependencies)
+        ]
 
     def mark_step_done(self, step_id: int, result: str):
         for step in self.steps:
             if step.id == step_id:
-                step.status = "completed"
+                self.set_status(step, "completed")
                 step.result = result
                 return
 
@@ -56,14 +126,14 @@ class ExecutionPlan:
             if step.id == step_id:
                 step.attempts += 1
                 if step.attempts >= step.max_attempts:
-                    step.status = "failed"
+                    self.set_status(step, "failed")
                 else:
-                    step.status = "pending"
+                    self.set_status(step, "pending")
                 step.error = error
                 return
 
     def is_complete(self) -> bool:
-        return all(s.status in ("completed", "failed") for s in self.steps)
+        return self.count("completed") + self.count("failed") == len(self.steps)
 
     def get_progress_text(self) -> str:
         lines = [f"**Rencana: {self.goal}**\n"]
@@ -90,13 +160,13 @@ class ExecutionPlan:
     def get_success_rate(self) -> float:
         if not self.steps:
             return 0.0
-        completed = sum(1 for s in self.steps if s.status == "completed")
-        return completed / len(self.steps)
+        return self.count("completed") / len(self.steps)
 
 
 class AutonomousOrchestrator:
-    def __init__(self, agents: dict, provider, ws_manager=None):
+    def __init__(self, agents: dict, provider, ws_manager=None, max_parallel: int = 3):
         self.agents = agents
+        self.max_parallel = max(1, max_parallel)
         self.provider = provider
         self.logger = Logger("orchestrator.log")
         self.plan: Optional[ExecutionPlan] = None
@@ -105,6 +175,13 @@ class AutonomousOrchestrator:
         self.last_answer = ""
         self.ws_manager = ws_manager
         self.persistent_memory = PersistentMemory()
+        self._agent_key_map: Dict[str, str] = {key.lower(): key for key in self.agents}
+
+    def _set_step_status(self, step: TaskStep, status: str):
+        if self.plan:
+            self.plan.set_status(step, status)
+        else:
+            step.status = status
 
     async def _notify_status(self, agent_name: str, status: str, progress: float = 0.0, details: str = ""):
         if self.ws_manager:
@@ -131,8 +208,8 @@ class AutonomousOrchestrator:
         if self.ws_manager and self.plan:
             try:
                 elapsed = time.time() - self.plan.start_time if self.plan.start_time else 0.0
-                completed = sum(1 for s in self.plan.steps if s.status == "completed")
-                failed = sum(1 for s in self.plan.steps if s.status == "failed")
+                completed = self.plan.count("completed")
+                failed = self.plan.count("failed")
                 total = len(self.plan.steps)
                 success_rate = self.plan.get_success_rate()
                 estimated_remaining = 0.0
@@ -165,26 +242,29 @@ class AutonomousOrchestrator:
                 agent_type=task_info.get('agent', 'coder'),
                 dependencies=deps,
             )
-            plan.steps.append(step)
+            plan.add_step(step)
         self.plan = plan
         self.logger.info(f"Plan created with {len(plan.steps)} steps for: {goal}")
         return plan
 
-    async def execute_step(self, step: TaskStep, required_infos: dict = None) -> Tuple[str, bool]:
-        step.status = "running"
-        agent_key = step.agent_type.lower()
-        if agent_key not in self.agents:
-            for key in self.agents:
-                if key.startswith(agent_key[:3]):
-                    agent_key = key
-                    break
-            else:
-                agent_key = "coder"
+    def _resolve_agent_key(self, agent_type: str) -> str:
+        agent_type = agent_type.lower()
+        agent_key = self._agent_key_map.get(agent_type)
+        if agent_key is None:
+            agent_key = next((key for key in self.agents if key.startswith(agent_type[:3])), "coder")
+            agent_key = self._agent_key_map.setdefault(agent_type, agent_key)
+        return agent_key
+
+    async def execute_step(self, step: TaskStep, required_infos: dict = None,
+                           rich_context: Optional[str] = None) -> Tuple[str, bool]:
+        self._set_step_status(step, "running")
+        agent_key = self._resolve_agent_key(step.agent_type)
 
         agent = self.agents[agent_key]
         prompt = step.description
 
-        rich_context = self._gather_rich_context()
+        if rich_context is None:
+            rich_context = self._gather_rich_context()
 
         if required_infos:
             context_parts = []
@@ -251,17 +331,17 @@ class AutonomousOrchestrator:
         reflection = ""
         if success:
             reflection = f"Langkah {step.id} berhasil: {step.description}"
-            step.status = "completed"
+            self._set_step_status(step, "completed")
             step.result = result
         else:
             step.attempts += 1
             if step.attempts >= step.max_attempts:
                 reflection = f"Langkah {step.id} gagal setelah {step.max_attempts} percobaan: {step.description}"
-                step.status = "failed"
+                self._set_step_status(step, "failed")
                 step.error = result
             else:
                 reflection = f"Langkah {step.id} gagal (percobaan {step.attempts}/{step.max_attempts}), akan dicoba lagi"
-                step.status = "pending"
+                self._set_step_status(step, "pending")
                 step.error = result
 
         if self.plan:
@@ -284,48 +364,23 @@ class AutonomousOrchestrator:
             return
 
         error_lower = (failed_step.error or "").lower()
-        recovery_agent = failed_step.agent_type.lower()
-        recovery_description = ""
-
-        if "no module named" in error_lower or "import" in error_lower:
-            recovery_agent = failed_step.agent_type.lower()
-            module_match = re.search(r"no module named ['\"]?(\w+)", error_lower)
-            module_name = module_match.group(1) if module_match else "yang dibutuhkan"
-            recovery_description = (
-                f"[RECOVERY - INSTALL DEPENDENCY] "
-                f"Install dependency '{module_name}' terlebih dahulu menggunakan pip install, "
-                f"lalu ulangi tugas: {failed_step.description}"
-            )
-        elif "permission" in error_lower or "access denied" in error_lower:
-            recovery_agent = "file"
-            recovery_description = (
-                f"[RECOVERY - FIX PERMISSIONS] "
-                f"Perbaiki permission/akses file yang bermasalah, "
-                f"lalu ulangi tugas: {failed_step.description}"
-            )
-        elif "syntax" in error_lower or "syntaxerror" in error_lower:
-            recovery_agent = "coder"
-            recovery_description = (
-                f"[RECOVERY - FIX SYNTAX] "
-                f"Perbaiki syntax error dalam kode. "
-                f"Baca file yang bermasalah, identifikasi error syntax, dan perbaiki. "
-                f"Tugas asli: {failed_step.description}"
-            )
-        elif "timeout" in error_lower or "connection" in error_lower:
-            recovery_agent = "web"
-            recovery_description = (
-                f"[RECOVERY - RETRY CONNECTION] "
-                f"Coba lagi dengan query pencarian berbeda atau URL alternatif. "
-                f"Tugas asli: {failed_step.description}"
+        matched = set()
+        module_name = None
+        for match in _RECOVERY_PATTERN.finditer(error_lower):
+            matched.add(match.lastgroup)
+            if module_name is None and match.group("module"):
+                module_name = match.group("module")
+
+        category = next((c for c in _RECOVERY_STRATEGIES if c in matched), None)
+        if category:
+            agent_override, template = _RECOVERY_STRATEGIES[category]
+            recovery_agent = agent_override or failed_step.agent_type.lower()
+            recovery_description = template.format(
+                module=module_name or "yang dibutuhkan",
+                description=failed_step.description,
             )
         else:
-            alternative_agents = {
-                "coder": "file",
-                "file": "coder",
-                "web": "casual",
-                "casual": "coder",
-            }
-            recovery_agent = alternative_agents.get(failed_step.agent_type.lower(), failed_step.agent_type)
+            recovery_agent = _ALTERNATIVE_AGENTS.get(failed_step.agent_type.lower(), failed_step.agent_type)
             recovery_description = (
                 f"[RECOVERY] Coba lagi dengan pendekatan berbeda: {failed_step.description}"
             )
@@ -343,7 +398,7 @@ class AutonomousOrchestrator:
             max_attempts=2,
             dependencies=failed_step.dependencies,
         )
-        self.plan.steps.append(retry_step)
+        self.plan.add_step(retry_step)
         self.logger.info(f"Plan revised: recovery step {retry_step.id} (agent: {recovery_agent}) for failed step {failed_step.id}")
 
     def _gather_rich_context(self) -> str:
@@ -351,8 +406,10 @@ class AutonomousOrchestrator:
             return ""
 
         context_parts = []
-        files_created = []
-        urls_found = []
+        seen_files: Set[str] = set()
+        unique_files: List[str] = []
+        seen_urls: Set[str] = set()
+        unique_urls: List[str] = []
 
         for step in self.plan.steps:
             if step.status != "completed" or not step.result:
@@ -363,14 +420,8 @@ class AutonomousOrchestrator:
                 f"  Hasil: {step.result[:300]}"
             )
 
-            file_patterns = re.findall(
-                r'(?:/home/runner/workspace/[^\s\'"]+|\.\/[^\s\'"]+|work(?:_dir)?/[^\s\'"]+)',
-                step.result
-            )
-            files_created.extend(file_patterns)
-
-            url_patterns = re.findall(r'https?://[^\s\'"<>]+', step.result)
-            urls_found.extend(url_patterns)
+            _collect_unique(_FILE_PATH_PATTERN, step.result, seen_files, unique_files, limit=20)
+            _collect_unique(_URL_PATTERN, step.result, seen_urls, unique_urls, limit=10)
 
         if not context_parts:
             return ""
@@ -378,15 +429,13 @@ class AutonomousOrchestrator:
         rich_context = "=== KONTEKS PROYEK ===\n"
         rich_context += "\n".join(context_parts)
 
-        if files_created:
-            unique_files = list(dict.fromkeys(files_created))
+        if unique_files:
             rich_context += "\n\n--- File yang sudah dibuat ---\n"
-            rich_context += "\n".join(f"  • {f}" for f in unique_files[:20])
+            rich_context += "\n".join(f"  • {f}" for f in unique_files)
 
-        if urls_found:
-            unique_urls = list(dict.fromkeys(urls_found))
+        if unique_urls:
             rich_context += "\n\n--- URL/Resource yang ditemukan ---\n"
-            rich_context += "\n".join(f"  • {u}" for u in unique_urls[:10])
+            rich_context += "\n".join(f"  • {u}" for u in unique_urls)
 
         rich_context += "\n=== END KONTEKS ===\n"
         return rich_context
@@ -395,20 +444,17 @@ class AutonomousOrchestrator:
         if not self.plan:
             return {}
 
-        completed = sum(1 for s in self.plan.steps if s.status == "completed")
-        failed = sum(1 for s in self.plan.steps if s.status == "failed")
-        skipped = sum(1 for s in self.plan.steps if s.status == "pending")
+        completed = self.plan.count("completed")
+        failed = self.plan.count("failed")
+        skipped = self.plan.count("pending")
         total = len(self.plan.steps)
         elapsed = time.time() - self.plan.start_time if self.plan.start_time else 0.0
 
-        files_created = []
+        seen_files: Set[str] = set()
+        files_created: List[str] = []
         for step in self.plan.steps:
             if step.status == "completed" and step.result:
-                file_patterns = re.findall(
-                    r'(?:/home/runner/workspace/[^\s\'"]+|\.\/[^\s\'"]+|work(?:_dir)?/[^\s\'"]+)',
-                    step.result
-                )
-                files_created.extend(file_patterns)
+                _collect_unique(_FILE_PATH_PATTERN, step.result, seen_files, files_created)
 
         return {
             "total_steps": total,
@@ -418,9 +464,49 @@ class AutonomousOrchestrator:
             "elapsed_time": round(elapsed, 2),
             "success_rate": round(completed / total, 2) if total > 0 else 0.0,
             "reflection_log": list(self.plan.reflection_log[-10:]),
-            "files_created": list(dict.fromkeys(files_created)),
+            "files_created": files_created,
         }
 
+    def _select_wave(self, ready_steps: List[TaskStep]) -> List[TaskStep]:
+        if not ready_steps:
+            return []
+        # The first ready step always runs. Others join the wave only when they declare explicit
+        # dependencies (steps without them rely on every earlier result) and target a different
+        # agent, since agents keep conversational state and cannot serve two steps at once.
+        wave = [ready_steps[0]]
+        busy_agents = {self._resolve_agent_key(ready_steps[0].agent_type)}
+        for step in ready_steps[1:]:
+            if len(wave) >= self.max_parallel:
+                break
+            agent_key = self._resolve_agent_key(step.agent_type)
+            if step.dependencies and agent_key not in busy_agents:
+                wave.append(step)
+                busy_agents.add(agent_key)
+        return wave
+
+    def _collect_required_infos(self, step: TaskStep) -> Optional[dict]:
+        required_infos = {}
+        for prev_step in self.plan.steps:
+            if str(prev_step.id) in step.dependencies and prev_step.status == "completed":
+                required_infos[str(prev_step.id)] = prev_step.result[:500] if prev_step.result else ""
+
+        if not required_infos:
+            for prev_step in self.plan.steps:
+                if prev_step.id < step.id and prev_step.status == "completed":
+                    required_infos[str(prev_step.id)] = prev_step.result[:300] if prev_step.result else ""
+        return required_infos or None
+
+    async def _execute_and_reflect(self, step: TaskStep, required_infos: Optional[dict],
+                                   rich_context: str) -> Tuple[TaskStep, str, bool]:
+        await self._send_peor("execute", step.id, step.description)
+        result, success = await self.execute_step(step, required_infos, rich_context)
+
+        await self._send_peor("observe", step.id, f"Success: {success}")
+        await self._send_peor("reflect", step.id, "Analyzing result")
+        reflection = self.reflect(step, result, success)
+        pretty_print(f">> {reflection}", color="info" if success else "warning")
+        return step, result, success
+
     async def run_loop(self, goal: str, agent_tasks: list, speech_module=None) -> str:
         plan = self.create_plan_from_tasks(goal, agent_tasks)
         work_results = {}
@@ -438,61 +524,57 @@ class AutonomousOrchestrator:
         consecutive_failures = 0
 
         while not plan.is_complete() and iteration < max_iterations:
-            step = plan.get_next_step()
-            if step is None:
-                has_pending = any(s.status == "pending" for s in plan.steps)
-                if has_pending:
+            wave = self._select_wave(plan.get_ready_steps())
+            if not wave:
+                if plan.count("pending"):
                     self.logger.warning("Dependency deadlock detected - marking blocked steps as failed")
                     for s in plan.steps:
                         if s.status == "pending":
-                            s.status = "failed"
+                            plan.set_status(s, "failed")
                             s.error = "Dependency deadlock: langkah yang dibutuhkan gagal"
                 break
 
-            iteration += 1
-            pretty_print(f"\n>> Langkah {step.id}/{len(plan.steps)}: {step.description}", color="status")
+            iteration += len(wave)
+            for step in wave:
+                pretty_print(f"\n>> Langkah {step.id}/{len(plan.steps)}: {step.description}", color="status")
             self.last_answer = plan.get_progress_text()
-            await self._notify_plan(step.id)
-
-            required_infos = {}
-            for prev_step in plan.steps:
-                if str(prev_step.id) in step.dependencies and prev_step.status == "completed":
-                    required_infos[str(prev_step.id)] = prev_step.result[:500] if prev_step.result else ""
-
-            if not required_infos:
-                for prev_step in plan.steps:
-                    if prev_step.id < step.id and prev_step.status == "completed":
-                        required_infos[str(prev_step.id)] = prev_step.result[:300] if prev_step.result else ""
-
-            await self._send_peor("execute", step.id, step.description)
-            result, success = await self.execute_step(step, required_infos if required_infos else None)
-
-            await self._send_peor("observe", step.id, f"Success: {success}")
-            await self._send_peor("reflect", step.id, "Analyzing result")
-            reflection = self.reflect(step, result, success)
-            pretty_print(f">> {reflection}", color="info" if success else "warning")
-
-            if success:
-                consecutive_failures = 0
-            else:
-                consecutive_failures += 1
+            await self._notify_plan(wave[0].id)
+
+            # Context is gathered once before the wave starts so concurrent steps never see each
+            # other's partial state. The steps share status_message, execution_memory and
+            # persistent_memory without a lock: they all run on this event loop and only write
+            # to them synchronously between awaits, so updates never interleave mid-write.
+            # status_message names whichever wave step started most recently.
+            rich_context = self._gather_rich_context()
+            wave_inputs = [(step, self._collect_required_infos(step)) for step in wave]
+            outcomes = await asyncio.gather(
+                *(self._execute_and_reflect(step, required_infos, rich_context)
+                  for step, required_infos in wave_inputs)
+            )
 
-            if not success and step.status == "failed":
-                if consecutive_failures < 3:
-                    await self._send_peor("revise", step.id, "Revising plan after failure")
-                    self.revise_plan(step)
+            for step, result, success in outcomes:
+                if success:
+                    consecutive_failures = 0
                 else:
-                    self.logger.warning(f"Too many consecutive failures ({consecutive_failures}), skipping recovery")
+                    consecutive_failures += 1
 
-            work_results[str(step.id)] = result
-            if success:
-                final_answer = result
+                if not success and step.status == "failed":
+                    if consecutive_failures < 3:
+                        await self._send_peor("revise", step.id, "Revising plan after failure")
+                        self.revise_plan(step)
+                    else:
+                        self.logger.warning(f"Too many consecutive failures ({consecutive_failures}), skipping recovery")
+
+                work_results[str(step.id)] = result
+                if success:
+                    final_answer = result
 
+            last_step = wave[-1]
             self.last_answer = plan.get_progress_text()
-            await self._notify_plan(step.id)
-            await self._send_progress(step.id, step.description)
+            await self._notify_plan(last_step.id)
+            await self._send_progress(last_step.id, last_step.description)
 
-        completed = sum(1 for s in plan.steps if s.status == "completed")
+        completed = plan.count("completed")
         total = len(plan.steps)
         elapsed = time.time() - plan.start_time
 
@@ -2,25 +2,49 @@ import os
 import json
 import time
 import datetime
-from typing import List, Dict, Optional
+from collections import defaultdict, deque
+from typing import Deque, List, Dict, Optional, Tuple, Union
 from sources.logger import Logger
 
 
+def ts_to_iso(ts: Union[float, str, None]) -> str:
+    """Format a stored timestamp for display; entries written before numeric timestamps are already ISO strings."""
+    if isinstance(ts, (int, float)):
+        return datetime.datetime.fromtimestamp(ts).isoformat()
+    return ts or ""
+
+
 class PersistentMemory:
     def __init__(self, storage_path: str = "memory_store"):
         self.storage_path = storage_path
         self.logger = Logger("persistent_memory.log")
         os.makedirs(storage_path, exist_ok=True)
 
-        self.facts_file = os.path.join(storage_path, "learned_facts.json")
+        self.facts_file = os.path.join(storage_path, "learned_facts.jsonl")
+        self.legacy_facts_file = os.path.join(storage_path, "learned_facts.json")
         self.skills_file = os.path.join(storage_path, "learned_skills.json")
         self.preferences_file = os.path.join(storage_path, "user_preferences.json")
         self.project_history_file = os.path.join(storage_path, "project_history.json")
 
-        self.facts: List[Dict] = self._load_json(self.facts_file, [])
+        if os.path.exists(self.facts_file):
+            loaded_facts, intact = self._load_jsonl(self.facts_file)
+            # A torn trailing record forces a rewrite before the next append.
+            self._facts_log_lines = len(loaded_facts) if intact else 0
+        else:
+            loaded_facts = self._load_json(self.legacy_facts_file, [])
+            self._facts_log_lines = 0
+        self.facts: Deque[Dict] = deque(loaded_facts, maxlen=500)
         self.skills: List[Dict] = self._load_json(self.skills_file, [])
         self.preferences: Dict = self._load_json(self.preferences_file, {})
-        self.project_history: List[Dict] = self._load_json(self.project_history_file, [])
+        self.project_history: Deque[Dict] = deque(self._load_json(self.project_history_file, []), maxlen=100)
+
+        self._by_category: Dict[str, Deque[Dict]] = defaultdict(deque)
+        self._rebuild_category_index()
+
+    def _rebuild_category_index(self):
+        self._by_category.clear()
+        for fact in self.facts:
+            self._by_category[fact["category"]].append(fact)
 
     def _load_json(self, filepath: str, default):
         try:
@@ -31,24 +55,75 @@ class PersistentMemory:
             self.logger.error(f"Failed to load {filepath}: {e}")
         return default
 
+    def _load_jsonl(self, filepath: str) -> Tuple[List[Dict], bool]:
+        records = []
+        intact = True
+        try:
+            with open(filepath, 'r', encoding='utf-8') as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        records.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        intact = False
+                        self.logger.warning(f"Skipping corrupt record in {filepath}")
+        except Exception as e:
+            intact = False
+            self.logger.error(f"Failed to load {filepath}: {e}")
+        return records, intact
+
+    def _write_atomic(self, filepath: str, text: str):
+        tmp_path = filepath + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, filepath)
+
     def _save_json(self, filepath: str, data):
         try:
-            with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+            self._write_atomic(filepath, json.dumps(data, ensure_ascii=False, indent=2))
         except Exception as e:
             self.logger.error(f"Failed to save {filepath}: {e}")
 
+    def _compact_facts(self):
+        try:
+            self._write_atomic(
+                self.facts_file,
+                "".join(json.dumps(fact, ensure_ascii=False) + "\n" for fact in self.facts),
+            )
+            self._facts_log_lines = len(self.facts)
+        except Exception as e:
+            self.logger.error(f"Failed to save {self.facts_file}: {e}")
+
+    def _append_fact(self, fact: Dict):
+        # The log starts from a full snapshot (also migrating the legacy JSON store) and is
+        # rewritten once evicted records make up half of it; otherwise writes are O(record).
+        if self._facts_log_lines == 0 or self._facts_log_lines >= 2 * self.facts.maxlen:
+            self._compact_facts()
+            return
+        try:
+            with open(self.facts_file, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(fact, ensure_ascii=False) + "\n")
+            self._facts_log_lines += 1
+        except Exception as e:
+            self.logger.error(f"Failed to save {self.facts_file}: {e}")
+
     def store_fact(self, category: str, content: str, source: str = "conversation"):
         fact = {
             "category": category,
             "content": content,
             "source": source,
-            "timestamp": datetime.datetime.now().isoformat(),
+            "timestamp": time.time(),
         }
+        if len(self.facts) == self.facts.maxlen:
+            # The evicted fact is the oldest entry of its own category bucket.
+            self._by_category[self.facts[0]["category"]].popleft()
         self.facts.append(fact)
-        if len(self.facts) > 500:
-            self.facts = self.facts[-500:]
-        self._save_json(self.facts_file, self.facts)
+        self._by_category[category].append(fact)
+        self._append_fact(fact)
         self.logger.info(f"Stored fact: {category} - {content[:50]}")
 
     def store_skill(self, name: str, description: str, code_example: str = "", tags: List[str] = None):
@@ -57,7 +132,7 @@ class PersistentMemory:
             "description": description,
             "code_example": code_example[:2000],
             "tags": tags or [],
-            "timestamp": datetime.datetime.now().isoformat(),
+            "timestamp": time.time(),
         }
         existing = [s for s in self.skills if s["name"] != name]
         existing.append(skill)
@@ -68,7 +143,7 @@ class PersistentMemory:
     def store_preference(self, key: str, value: str):
         self.preferences[key] = {
             "value": value,
-            "updated_at": datetime.datetime.now().isoformat(),
+            "updated_at": time.time(),
         }
         self._save_json(self.preferences_file, self.preferences)
 
@@ -79,17 +154,16 @@ class PersistentMemory:
             "path": path,
             "description": description,
             "status": status,
-            "created_at": datetime.datetime.now().isoformat(),
+            "created_at": time.time(),
         }
         self.project_history.append(project)
-        if len(self.project_history) > 100:
-            self.project_history = self.project_history[-100:]
-        self._save_json(self.project_history_file, self.project_history)
+        self._save_json(self.project_history_file, list(self.project_history))
 
-    def search_facts(self, query: str, limit: int = 5) -> List[Dict]:
+    def search_facts(self, query: str, category: Optional[str] = None, limit: int = 5) -> List[Dict]:
         query_lower = query.lower()
         scored = []
-        for fact in self.facts:
+        candidates = self._by_category.get(category, ()) if category else self.facts
+        for fact in candidates:
             content_lower = fact["content"].lower()
             score = sum(1 for word in query_lower.split() if word in content_lower)
             if score > 0:
@@ -112,7 +186,7 @@ class PersistentMemory:
         return {k: v["value"] for k, v in self.preferences.items()}
 
     def get_recent_projects(self, limit: int = 5) -> List[Dict]:
-        return self.project_history[-limit:]
+        return list(self.project_history)[-limit:]
 
     def get_context_for_prompt(self, query: str) -> str:
         context_parts = []
@@ -1,133 +1,386 @@
 import asyncio
 import json
 import time
-from typing import Dict, Set, Optional
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Set, Optional, Tuple
 from fastapi import WebSocket
+from fastapi.websockets import WebSocketState
 from sources.logger import Logger
 
 
+# Fallback for values the serializers do not handle natively (plan objects, sets, ...).
+def _encode_default(obj):
+    if isinstance(obj, (set, frozenset, tuple)):
+        return list(obj)
+    if hasattr(obj, "__dict__"):
+        return vars(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not serializable")
+
+
+try:
+    import orjson
+
+    _ORJSON_OPTS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+    def _dumps(message: Dict) -> str:
+        return orjson.dumps(message, default=_encode_default, option=_ORJSON_OPTS).decode("utf-8")
+except ImportError:
+    def _dumps(message: Dict) -> str:
+        return json.dumps(message, ensure_ascii=False, default=_encode_default)
+
+try:
+    import msgpack
+    # One reusable packer instead of the fresh Packer that msgpack.packb builds per call.
+    _packer = msgpack.Packer(use_bin_type=True, default=_encode_default)
+except ImportError:
+    msgpack = None
+
+_time_ns = time.time_ns
+
+
+def _now_ms() -> int:
+    # Integer epoch milliseconds: cheaper to serialize than a float and, unlike
+    # nanoseconds, still exact as a JavaScript number.
+    return _time_ns() // 1_000_000
+
+
+def _cap(text: str, limit: int) -> str:
+    return text if len(text) <= limit else text[:limit]
+
+
+SEND_TIMEOUT = 5.0
+SEND_QUEUE_SIZE = 256
+ENCODE_CACHE_SIZE = 128
+COALESCE_INTERVAL = 1 / 30
+BATCH_INTERVAL = 0.01
+MSGPACK_SUBPROTOCOL = "msgpack"
+
+# Key layouts for the high-frequency events; helpers copy and fill these instead of
+# building a dict literal, keeping field order stable for the serializer.
+_STATUS_TPL = {"type": "status", "agent_name": "", "status": "", "progress": 0.0, "details": "", "timestamp": 0}
+_PEOR_TPL = {"type": "peor", "phase": "", "step_id": 0, "details": "", "timestamp": 0}
+_PLAN_PROGRESS_TPL = {
+    "type": "plan_progress",
+    "total_steps": 0,
+    "completed_steps": 0,
+    "failed_steps": 0,
+    "current_step_id": 0,
+    "current_step_description": "",
+    "elapsed_time": 0.0,
+    "estimated_remaining": 0.0,
+    "success_rate": 0.0,
+    "timestamp": 0,
+}
+
+# Event types a client may subscribe to with ?topics=; anything else is ignored so a
+# client cannot grow the subscription table with arbitrary names.
+EVENT_TYPES = frozenset({
+    "status", "execution", "file_update", "plan", "preview_ready", "peor",
+    "agent_switch", "agent_thinking", "execution_log", "plan_progress",
+})
+
+# These carry a changing progress/elapsed value on nearly every call, so a cache lookup
+# almost never hits and building its key costs more than serializing outright.
+_UNCACHED_TYPES = frozenset({"status", "plan_progress"})
+
+
 class ConnectionManager:
+    __slots__ = (
+        "active_connections",
+        "_conn_index",
+        "msgpack_connections",
+        "batch_connections",
+        "_subs",
+        "_filtered",
+        "_send_queues",
+        "_writers",
+        "logger",
+        "_pending",
+        "_outbox",
+        "_flush_task",
+        "_text_cache",
+    )
+
     def __init__(self):
-        self.active_connections: Set[WebSocket] = set()
+        # Contiguous list for fast broadcast iteration; _conn_index maps id(ws) to its slot
+        # so disconnects can swap-remove in O(1).
+        self.active_connections: List[WebSocket] = []
+        self._conn_index: Dict[int, int] = {}
+        # Clients that negotiated the msgpack subprotocol receive binary frames.
+        self.msgpack_connections: Set[WebSocket] = set()
+        # Clients that connected with ?batch=1 receive bursts as one {"type": "batch"} frame.
+        self.batch_connections: Set[WebSocket] = set()
+        # Clients that connected with ?topics=a,b only receive those event types; everyone
+        # else receives every event.
+        self._subs: Dict[str, Set[WebSocket]] = {}
+        self._filtered: Set[WebSocket] = set()
+        # Each connection drains its own bounded queue in a writer task, so a slow client
+        # only delays itself and broadcast never awaits the network.
+        self._send_queues: Dict[int, asyncio.Queue] = {}
+        self._writers: Dict[int, asyncio.Task] = {}
         self.logger = Logger("realtime.log")
+        # One ordered outbox for every buffered event. High-frequency updates are latest-wins:
+        # _pending maps their key to the outbox slot holding the current value, and a newer
+        # value empties that slot and is appended, so delivery follows send order.
+        self._pending: Dict[str, int] = {}
+        self._outbox: List[Optional[Dict]] = []
+        self._flush_task: Optional[asyncio.Task] = None
+        # LRU of JSON bodies keyed by every field except the timestamp, which is spliced in.
+        self._text_cache: "OrderedDict[tuple, str]" = OrderedDict()
 
     async def connect(self, websocket: WebSocket):
-        await websocket.accept()
-        self.active_connections.add(websocket)
+        requested = websocket.scope.get("subprotocols") or []
+        if msgpack is not None and MSGPACK_SUBPROTOCOL in requested:
+            await websocket.accept(subprotocol=MSGPACK_SUBPROTOCOL)
+            self.msgpack_connections.add(websocket)
+        else:
+            await websocket.accept()
+        if websocket.query_params.get("batch") in ("1", "true"):
+            self.batch_connections.add(websocket)
+        topics = [t.strip() for t in (websocket.query_params.get("topics") or "").split(",") if t.strip()]
+        if topics:
+            self._filtered.add(websocket)
+            for topic in topics:
+                if topic in EVENT_TYPES:
+                    self._subs.setdefault(topic, set()).add(websocket)
+        if id(websocket) not in self._conn_index:
+            self._conn_index[id(websocket)] = len(self.active_connections)
+            self.active_connections.append(websocket)
+            queue = asyncio.Queue(maxsize=SEND_QUEUE_SIZE)
+            self._send_queues[id(websocket)] = queue
+            self._writers[id(websocket)] = asyncio.get_running_loop().create_task(self._writer(websocket, queue))
         self.logger.info(f"WebSocket connected. Total: {len(self.active_connections)}")
 
+    def _forget(self, websocket: WebSocket):
+        index = self._conn_index.pop(id(websocket), None)
+        if index is not None:
+            last = self.active_connections.pop()
+            if index < len(self.active_connections):
+                self.active_connections[index] = last
+                self._conn_index[id(last)] = index
+        self.msgpack_connections.discard(websocket)
+        self.batch_connections.discard(websocket)
+        if websocket in self._filtered:
+            self._filtered.discard(websocket)
+            for topic, subscribers in list(self._subs.items()):
+                subscribers.discard(websocket)
+                if not subscribers:
+                    del self._subs[topic]
+        self._send_queues.pop(id(websocket), None)
+        writer = self._writers.pop(id(websocket), None)
+        if writer is not None and writer is not asyncio.current_task():
+            writer.cancel()
+
     def disconnect(self, websocket: WebSocket):
-        self.active_connections.discard(websocket)
+        self._forget(websocket)
         self.logger.info(f"WebSocket disconnected. Total: {len(self.active_connections)}")
 
-    async def broadcast(self, message: Dict):
-        if not self.active_connections:
-            return
-        dead = set()
-        msg_text = json.dumps(message, ensure_ascii=False)
-        for ws in self.active_connections:
+    async def _writer(self, ws: WebSocket, queue: asyncio.Queue):
+        while True:
+            frame = await queue.get()
+            if ws.client_state != WebSocketState.CONNECTED:
+                self._forget(ws)
+                return
             try:
-                await ws.send_text(msg_text)
+                # Raw ASGI send: the frame is already built, so skip send_text's per-call wrapping.
+                await asyncio.wait_for(ws.send(frame), SEND_TIMEOUT)
             except Exception:
-                dead.add(ws)
-        for ws in dead:
-            self.active_connections.discard(ws)
+                self._forget(ws)
+                return
+
+    def _post(self, ws: WebSocket, frame: Dict):
+        queue = self._send_queues.get(id(ws))
+        if queue is None:
+            return
+        try:
+            queue.put_nowait(frame)
+        except asyncio.QueueFull:
+            # Drop the oldest frame for clients that cannot keep up.
+            queue.get_nowait()
+            queue.put_nowait(frame)
+
+    def _encode_text(self, message: Dict, _dumps=_dumps) -> str:
+        if "timestamp" not in message or message.get("type") in _UNCACHED_TYPES:
+            return _dumps(message)
+        # The value's class is part of the key so that e.g. True and 1 do not share an entry.
+        key = tuple((k, v.__class__, v) for k, v in message.items() if k != "timestamp")
+        try:
+            body = self._text_cache.get(key)
+        except TypeError:
+            return _dumps(message)
+        if body is None:
+            body = _dumps({k: v for k, v in message.items() if k != "timestamp"})
+            self._text_cache[key] = body
+            if len(self._text_cache) > ENCODE_CACHE_SIZE:
+                self._text_cache.popitem(last=False)
+        else:
+            self._text_cache.move_to_end(key)
+        return f'{body[:-1]},"timestamp":{_dumps(message["timestamp"])}}}'
+
+    def _recipients(self, message_type: str) -> Tuple[WebSocket, ...]:
+        # Snapshot the connection list once so a disconnect during fan-out cannot mutate
+        # what is being iterated.
+        if not self._filtered:
+            return tuple(self.active_connections)
+        return (
+            *(ws for ws in self.active_connections if ws not in self._filtered),
+            *self._subs.get(message_type, ()),
+        )
+
+    async def broadcast(self, message: Dict, targets: Optional[Iterable[WebSocket]] = None):
+        conns = self._recipients(message.get("type")) if targets is None else tuple(targets)
+        if not conns:
+            return
+        binary_conns = [ws for ws in conns if ws in self.msgpack_connections]
+        text_conns = [ws for ws in conns if ws not in self.msgpack_connections] if binary_conns else conns
+        # Each payload is encoded once and wrapped in a single ASGI frame shared by every
+        # recipient, instead of send_text/send_bytes building a new frame per client.
+        post = self._post
+        if text_conns:
+            text_frame = {"type": "websocket.send", "text": self._encode_text(message)}
+            for ws in text_conns:
+                post(ws, text_frame)
+        if binary_conns:
+            bytes_frame = {"type": "websocket.send", "bytes": _packer.pack(message)}
+            for ws in binary_conns:
+                post(ws, bytes_frame)
+
+    def _coalesce(self, key: str, message: Dict):
+        if not self.active_connections:
+            return
+        slot = self._pending.get(key)
+        if slot is not None:
+            self._outbox[slot] = None
+        self._pending[key] = len(self._outbox)
+        self._outbox.append(message)
+        self._schedule_flush(COALESCE_INTERVAL)
+
+    def _enqueue(self, message: Dict):
+        if not self.active_connections:
+            return
+        self._outbox.append(message)
+        self._schedule_flush(BATCH_INTERVAL)
+
+    def _schedule_flush(self, delay: float):
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.get_running_loop().create_task(self._flush_outbox(delay))
+
+    async def _flush_outbox(self, delay: float):
+        await asyncio.sleep(delay)
+        drained, self._outbox, self._pending = self._outbox, [], {}
+        await self._deliver([message for message in drained if message is not None])
+
+    async def _deliver(self, messages: List[Dict]):
+        # Topic-filtered clients always get individual frames so each event can be routed.
+        batch_conns = [ws for ws in self.batch_connections if ws not in self._filtered]
+        if len(messages) > 1 and batch_conns:
+            await self.broadcast({"type": "batch", "events": messages, "timestamp": _now_ms()}, batch_conns)
+            batched = set(batch_conns)
+            for message in messages:
+                await self.broadcast(message, [ws for ws in self._recipients(message["type"]) if ws not in batched])
+        else:
+            for message in messages:
+                await self.broadcast(message)
 
     async def send_status(self, agent_name: str, status: str, progress: float = 0.0, details: str = ""):
-        await self.broadcast({
-            "type": "status",
-            "agent_name": agent_name,
-            "status": status,
-            "progress": progress,
-            "details": details,
-            "timestamp": time.time(),
-        })
+        if not self.active_connections:
+            return
+        m = _STATUS_TPL.copy()
+        m["agent_name"] = agent_name
+        m["status"] = status
+        m["progress"] = progress
+        m["details"] = details
+        m["timestamp"] = _now_ms()
+        self._coalesce(f"status:{agent_name}", m)
 
     async def send_execution_update(self, language: str, code_snippet: str, result: str, success: bool):
-        await self.broadcast({
+        self._enqueue({
             "type": "execution",
             "language": language,
-            "code_snippet": code_snippet[:500],
-            "result": result[:1000],
+            "code_snippet": _cap(code_snippet, 500),
+            "result": _cap(result, 1000),
             "success": success,
-            "timestamp": time.time(),
+            "timestamp": _now_ms(),
         })
 
     async def send_file_update(self, action: str, filepath: str, content: str = ""):
-        await self.broadcast({
+        self._enqueue({
             "type": "file_update",
             "action": action,
             "filepath": filepath,
-            "content": content[:2000] if content else "",
-            "timestamp": time.time(),
+            "content": _cap(content, 2000) if content else "",
+            "timestamp": _now_ms(),
         })
 
     async def send_plan_update(self, plan: list, current_step: int = 0):
-        await self.broadcast({
+        self._enqueue({
             "type": "plan",
             "plan": plan,
             "current_step": current_step,
-            "timestamp": time.time(),
+            "timestamp": _now_ms(),
         })
 
     async def send_preview_ready(self, preview_url: str, project_type: str):
-        await self.broadcast({
+        self._enqueue({
             "type": "preview_ready",
             "preview_url": preview_url,
             "project_type": project_type,
-            "timestamp": time.time(),
+            "timestamp": _now_ms(),
         })
 
     async def send_peor_update(self, phase: str, step_id: int = 0, details: str = ""):
-        await self.broadcast({
-            "type": "peor",
-            "phase": phase,
-            "step_id": step_id,
-            "details": details,
-            "timestamp": time.time(),
-        })
+        if not self.active_connections:
+            return
+        m = _PEOR_TPL.copy()
+        m["phase"] = phase
+        m["step_id"] = step_id
+        m["details"] = details
+        m["timestamp"] = _now_ms()
+        # Each phase is its own event, so PEOR updates are never merged.
+        self._enqueue(m)
 
     async def send_agent_switch(self, agent_name: str, agent_type: str):
-        await self.broadcast({
+        self._enqueue({
             "type": "agent_switch",
             "agent_name": agent_name,
             "agent_type": agent_type,
-            "timestamp": time.time(),
+            "timestamp": _now_ms(),
         })
 
     async def send_agent_thinking(self, agent_name: str, thinking_message: str):
-        await self.broadcast({
+        self._enqueue({
             "type": "agent_thinking",
             "agent_name": agent_name,
             "thinking_message": thinking_message,
-            "timestamp": time.time(),
+            "timestamp": _now_ms(),
         })
 
     async def send_execution_log(self, level: str, message: str, agent_name: str = ""):
-        await self.broadcast({
+        self._enqueue({
             "type": "execution_log",
             "level": level,
             "message": message,
             "agent_name": agent_name,
-            "timestamp": time.time(),
+            "timestamp": _now_ms(),
         })
 
     async def send_plan_progress(self, total_steps: int, completed_steps: int, failed_steps: int,
                                   current_step_id: int = 0, current_step_description: str = "",
                                   elapsed_time: float = 0.0, estimated_remaining: float = 0.0,
                                   success_rate: float = 0.0):
-        await self.broadcast({
-            "type": "plan_progress",
-            "total_steps": total_steps,
-            "completed_steps": completed_steps,
-            "failed_steps": failed_steps,
-            "current_step_id": current_step_id,
-            "current_step_description": current_step_description,
-            "elapsed_time": elapsed_time,
-            "estimated_remaining": estimated_remaining,
-            "success_rate": success_rate,
-            "timestamp": time.time(),
-        })
+        if not self.active_connections:
+            return
+        m = _PLAN_PROGRESS_TPL.copy()
+        m["total_steps"] = total_steps
+        m["completed_steps"] = completed_steps
+        m["failed_steps"] = failed_steps
+        m["current_step_id"] = current_step_id
+        m["current_step_description"] = current_step_description
+        m["elapsed_time"] = elapsed_time
+        m["estimated_remaining"] = estimated_remaining
+        m["success_rate"] = success_rate
+        m["timestamp"] = _now_ms()
+        self._coalesce("plan_progress", m)
 
 
 ws_manager = ConnectionManager()
@@ -1,10 +1,13 @@
 import os
+import re
 import sys
+import copy
+import functools
+import hashlib
+from operator import itemgetter
 import torch
-import random
-from typing import List, Tuple, Type, Dict
+from typing import List, Tuple
 
-from transformers import pipeline
 from adaptive_classifier import AdaptiveClassifier
 
 from sources.agents.agent import Agent
@@ -19,32 +22,557 @@ from sources.language import LanguageUtility
 from sources.utility import pretty_print, animate_thinking, timer_decorator
 from sources.logger import Logger
 
+_FEWSHOT_COMPLEXITY: Tuple[Tuple[str, str], ...] = (
+    ("hi", "LOW"),
+    ("How it's going ?", "LOW"),
+    ("What's the weather like today?", "LOW"),
+    ("Can you find a file named 'notes.txt' in my Documents folder?", "LOW"),
+    ("Write a Python script to generate a random password", "LOW"),
+    ("Debug this JavaScript code that's not running properly", "LOW"),
+    ("Search the web for the cheapest laptop under $500", "LOW"),
+    ("Locate a file called 'report_2024.pdf' on my drive", "LOW"),
+    ("Check if a folder named 'Backups' exists on my system", "LOW"),
+    ("Can you find 'family_vacation.mp4' in my Videos folder?", "LOW"),
+    ("Search my drive for a file named 'todo_list.xlsx'", "LOW"),
+    ("Write a Python function to check if a string is a palindrome", "LOW"),
+    ("Can you search the web for startups in Berlin?", "LOW"),
+    ("Find recent articles on blockchain technology online", "LOW"),
+    ("Check if 'Personal_Projects' folder exists on my desktop", "LOW"),
+    ("Create a bash script to list all running processes", "LOW"),
+    ("Debug this Python script that's crashing on line 10", "LOW"),
+    ("Browse the web to find out who invented Python", "LOW"),
+    ("Locate a file named 'shopping_list.txt' on my system", "LOW"),
+    ("Search the web for tips on staying productive", "LOW"),
+    ("Find 'sales_pitch.pptx' in my Downloads folder", "LOW"),
+    ("can you find a file called resume.docx on my drive?", "LOW"),
+    ("can you write a python script to check if the device on my network is connected to the internet", "LOW"),
+    ("can you debug this Java code? It's not working.", "LOW"),
+    ("can you find the old_project.zip file somewhere on my drive?", "LOW"),
+    ("can you locate the backup folder I created last month on my system?", "LOW"),
+    ("could you check if the presentation.pdf file exists in my downloads?", "LOW"),
+    ("search my drive for a file called vacation_photos_2023.jpg.", "LOW"),
+    ("help me organize my desktop files into folders by type.", "LOW"),
+    ("make a blackjack in golang", "LOW"),
+    ("write a python script to ping a website", "LOW"),
+    ("write a simple Java program to print 'Hello World'", "LOW"),
+    ("write a Java program to calculate the area of a circle", "LOW"),
+    ("write a Python function to sort a list of dictionaries by key", "LOW"),
+    ("can you search for startup in tokyo?", "LOW"),
+    ("find the latest updates on quantum computing on the web", "LOW"),
+    ("check if the folder 'Work_Projects' exists on my desktop", "LOW"),
+    (" can you browse the web, use overpass-turbo to show fountains in toulouse", "LOW"),
+    ("search the web for the best budget smartphones of 2025", "LOW"),
+    ("write a Python script to download all images from a webpage", "LOW"),
+    ("create a bash script to monitor CPU usage", "LOW"),
+    ("debug this C++ code that keeps crashing", "LOW"),
+    ("can you browse the web to find out who fosowl is ?", "LOW"),
+    ("find the file 'important_notes.txt'", "LOW"),
+    ("search the web for the best ways to learn a new language", "LOW"),
+    ("locate the file 'presentation.pptx' in my Documents folder", "LOW"),
+    ("Make a 3d game in javascript using three.js", "LOW"),
+    ("Find the latest research papers on AI and build save in a file", "HIGH"),
+    ("Make a web server in go that serve a simple html page", "LOW"),
+    ("Search the web for the cheapest 4K monitor and provide a link", "LOW"),
+    ("Write a JavaScript function to reverse a string", "LOW"),
+    ("Can you locate a file called 'budget_2025.xlsx' on my system?", "LOW"),
+    ("Search the web for recent articles on space exploration", "LOW"),
+    ("when is the exam period for master student in france?", "LOW"),
+    ("Check if a folder named 'Photos_2024' exists on my desktop", "LOW"),
+    ("Can you look up some nice knitting patterns on that web thingy?", "LOW"),
+    ("Goodness, check if my 'Photos_Grandkids' folder is still on the desktop", "LOW"),
+    ("Create a Python script to rename all files in a folder based on their creation date", "LOW"),
+    ("Can you find a file named 'meeting_notes.txt' in my Downloads folder?", "LOW"),
+    ("Write a Go program to check if a port is open on a network", "LOW"),
+    ("Search the web for the latest electric car reviews", "LOW"),
+    ("Write a Python function to merge two sorted lists", "LOW"),
+    ("Create a bash script to monitor disk space and alert via text file", "LOW"),
+    ("What's out there on the web about cheap travel spots?", "LOW"),
+    ("Search X for posts about AI ethics and summarize them", "LOW"),
+    ("Check if a file named 'project_proposal.pdf' exists in my Documents", "LOW"),
+    ("Search the web for tips on improving coding skills", "LOW"),
+    ("Write a Python script to count words in a text file", "LOW"),
+    ("Search the web for restaurant", "LOW"),
+    ("Use a MCP to find the latest stock market data", "LOW"),
+    ("Use a MCP to send an email to my boss", "LOW"),
+    ("Could you use a MCP to find the latest news on climate change?", "LOW"),
+    ("Create a simple HTML page with CSS styling", "LOW"),
+    ("Use file.txt and then use it to ...", "HIGH"),
+    ("Yo, what's good? Find my 'mixtape.mp3' real quick", "LOW"),
+    ("Can you follow the readme and install the project", "HIGH"),
+    ("Man, write me a dope Python script to flex some random numbers", "LOW"),
+    ("Search the web for peer-reviewed articles on gene editing", "LOW"),
+    ("Locate 'meeting_notes.docx' in Downloads, I'm late for this call", "LOW"),
+    ("Make the game less hard", "LOW"),
+    ("Why did it fail?", "LOW"),
+    ("Write a Python script to list all .pdf files in my Documents", "LOW"),
+    ("Write a Python thing to sort my .jpg files by date", "LOW"),
+    ("make a snake game please", "LOW"),
+    ("Find 'gallery_list.pdf', then build a web app to show my pics", "HIGH"),
+    ("Find 'budget_2025.xlsx', analyze it, and make a chart for my boss", "HIGH"),
+    ("I want you to make me a plan to travel to Tainan", "HIGH"),
+    ("Retrieve the latest publications on CRISPR and develop a web application to display them", "HIGH"),
+    ("Bro dig up a music API and build me a tight app for the hottest tracks", "HIGH"),
+    ("Find a public API for sports scores and build a web app to show live updates", "HIGH"),
+    ("Find a public API for book data and create a Flask app to list bestsellers", "HIGH"),
+    ("Organize my desktop files by extension and then write a script to list them", "HIGH"),
+    ("Find the latest research on renewable energy and build a web app to display it", "HIGH"),
+    ("search online for popular sci-fi movies from 2024 and pick three to watch tonight. Save the list in movie_night.txt", "HIGH"),
+    ("can you find vitess repo, clone it and install by following the readme", "HIGH"),
+    ("Create a JavaScript game using Phaser.js with multiple levels", "HIGH"),
+    ("Search the web for the latest trends in web development and build a sample site", "HIGH"),
+    ("Use my research_note.txt file, double check the informations on the web", "HIGH"),
+    ("Make a web server in go that query a flight API and display them in a app", "HIGH"),
+    ("Search the web for top cafes in Rennes, France, and save a list of three with their addresses in rennes_cafes.txt.", "HIGH"),
+    ("Search the web for the latest trends in AI and demo it in pytorch", "HIGH"),
+    ("can you lookup for api that track flight and build a web flight tracking app", "HIGH"),
+    ("Find the file toto.pdf then use its content to reply to Jojo on superforum.com", "HIGH"),
+    ("Create a whole web app in python using the flask framework that query news API", "HIGH"),
+    ("Create a bash script that monitor the CPU usage and send an email if it's too high", "HIGH"),
+    ("Make a web search for latest news on the stock market and display them with python", "HIGH"),
+    ("Find my resume file, apply to job that might fit online", "HIGH"),
+    ("Can you find a weather API and build a Python app to display current weather", "HIGH"),
+    ("Create a Python web app using Flask to track cryptocurrency prices from an API", "HIGH"),
+    ("Search the web for tutorials on machine learning and build a simple ML model in Python", "HIGH"),
+    ("Find a public API for movie data and build a web app to display movie ratings", "HIGH"),
+    ("Create a Node.js server that queries a public API for traffic data and displays it", "HIGH"),
+    ("can you find api and build a python web app with it ?", "HIGH"),
+    ("do a deep search of current AI player for 2025 and make me a report in a file", "HIGH"),
+    ("Find a public API for recipe data and build a web app to display recipes", "HIGH"),
+    ("Search the web for recent space mission updates and build a Flask app", "HIGH"),
+    ("Create a Python script to scrape a website and save data to a database", "HIGH"),
+    ("Find a shakespear txt then train a transformers on it to generate text", "HIGH"),
+    ("Find a public API for fitness tracking and build a web app to show stats", "HIGH"),
+    ("Search the web for tutorials on web development and build a sample site", "HIGH"),
+    ("Create a Node.js app to query a public API for event listings and display them", "HIGH"),
+    ("Find a file named 'budget.xlsx', analyze its data, and generate a chart", "HIGH"),
+    ("buatkan website kalkulator", "LOW"),
+    ("buat game snake python", "LOW"),
+    ("buat halaman web sederhana", "LOW"),
+    ("buatkan script python sederhana", "LOW"),
+    ("buatkan saya website profil portfolio", "LOW"),
+    ("buat website portfolio saya", "LOW"),
+    ("buatkan website toko online", "LOW"),
+    ("buat landing page modern", "LOW"),
+    ("buatkan website profil profolio", "LOW"),
+    ("buatkan saya website blog", "LOW"),
+    ("buat website dashboard admin", "LOW"),
+    ("buatkan form login register", "LOW"),
+    ("buatkan website dan cari referensi online lalu deploy", "HIGH"),
+)
+
+_FEWSHOT_TASKS: Tuple[Tuple[str, str], ...] = (
+    ("Write a python script to check if the device on my network is connected to the internet", "coding"),
+    ("Hey could you search the web for the latest news on the tesla stock market ?", "web"),
+    ("I would like you to search for weather api", "web"),
+    ("Plan a 3-day trip to New York, including flights and hotels.", "web"),
+    ("Find on the web the latest research papers on AI.", "web"),
+    ("Can you debug this Java code? It's not working.", "code"),
+    ("Can you browse the web and find me a 4090 for cheap?", "web"),
+    ("i would like to setup a new AI project, index as mark2", "files"),
+    ("Hey, can you find the old_project.zip file somewhere on my drive?", "files"),
+    ("Tell me a funny story", "talk"),
+    ("can you make a snake game in python", "code"),
+    ("Can you locate the backup folder I created last month on my system?", "files"),
+    ("Share a random fun fact about space.", "talk"),
+    ("Write a script to rename all files in a directory to lowercase.", "files"),
+    ("Could you check if the presentation.pdf file exists in my downloads?", "files"),
+    ("Tell me about the weirdest dream you've ever heard of.", "talk"),
+    ("Search my drive for a file called vacation_photos_2023.jpg.", "files"),
+    ("Help me organize my desktop files into folders by type.", "files"),
+    ("What's your favorite movie and why?", "talk"),
+    ("what directory are you in ?", "files"),
+    ("what files you seing rn ?", "files"),
+    ("When is the period of university exam in france ?", "web"),
+    ("Search my drive for a file named budget_2024.xlsx", "files"),
+    ("Write a Python function to sort a list of dictionaries by key", "code"),
+    ("Find the latest updates on quantum computing on the web", "web"),
+    ("Check if the folder 'Work_Projects' exists on my desktop", "files"),
+    ("Create a bash script to monitor CPU usage", "code"),
+    ("Search online for the best budget smartphones of 2025", "web"),
+    ("What's the strangest food combination you've heard of?", "talk"),
+    ("Move all .txt files from Downloads to a new folder called Notes", "files"),
+    ("Debug this C++ code that keeps crashing", "code"),
+    ("can you browse the web to find out who fosowl is ?", "web"),
+    ("Find the file 'important_notes.txt'", "files"),
+    ("Find out the latest news on the upcoming Mars mission", "web"),
+    ("Write a Java program to calculate the area of a circle", "code"),
+    ("Search the web for the best ways to learn a new language", "web"),
+    ("Locate the file 'presentation.pptx' in my Documents folder", "files"),
+    ("Write a Python script to download all images from a webpage", "code"),
+    ("Search the web for the latest trends in AI and machine learning", "web"),
+    ("Tell me about a time when you had to solve a difficult problem", "talk"),
+    ("Organize all image files on my desktop into a folder called 'Pictures'", "files"),
+    ("Generate a Ruby script to calculate Fibonacci numbers up to 100", "code"),
+    ("Find out what device are connected to my network", "code"),
+    ("Show me how much disk space is left on my drive", "code"),
+    ("Look up recent posts on X about climate change", "web"),
+    ("Find the photo I took last week named sunset_beach.jpg", "files"),
+    ("Write a JavaScript snippet to fetch data from an API", "code"),
+    ("Search the web for tutorials on machine learning with Python", "web"),
+    ("Locate the file 'meeting_notes.docx' in my Documents folder", "files"),
+    ("Write a Python script to scrape a website's title and links", "code"),
+    ("Search the web for the latest breakthroughs in fusion energy", "web"),
+    ("Tell me about a historical event that sounds too wild to be true", "talk"),
+    ("Find recent X posts about SpaceX's next rocket launch", "web"),
+    ("What's the funniest misunderstanding you've seen between humans and AI?", "talk"),
+    ("Check if 'backup_032025.zip' exists anywhere on my drive", "files" ),
+    ("Create a shell script to automate backups of a directory", "code"),
+    ("Look up the top AI conferences happening in 2025 online", "web"),
+    ("Write a C# program to simulate a basic calculator", "code"),
+    ("Browse the web for open-source alternatives to Photoshop", "web"),
+    ("Hey how are you", "talk"),
+    ("Write a Python script to ping a website", "code"),
+    ("Search the web for the latest iPhone release", "web"),
+    ("What's the weather like today?", "web"),
+    ("Hi, how's your day going?", "talk"),
+    ("Can you find a file called resume.docx on my drive?", "files"),
+    ("Write a simple Java program to print 'Hello World'", "code"),
+    ("can you find the current stock of Tesla?", "web"),
+    ("Tell me a quick joke", "talk"),
+    ("Search online for the best coffee shops in Seattle", "web"),
+    ("Check if 'project_plan.pdf' exists in my Downloads folder", "files"),
+    ("What's your favorite color?", "talk"),
+    ("Write a bash script to list all files in a directory", "code"),
+    ("Find recent X posts about electric cars", "web"),
+    ("Hey, you doing okay?", "talk"),
+    ("Locate the file 'family_photo.jpg' on my system", "files"),
+    ("Search the web for beginner guitar lessons", "web"),
+    ("Write a Python function to reverse a string", "code"),
+    ("What's the weirdest animal you know of?", "talk"),
+    ("Organize all .pdf files on my desktop into a 'Documents' folder", "files"),
+    ("Browse the web for the latest space mission updates", "web"),
+    ("Hey, what's up with you today?", "talk"),
+    ("Write a JavaScript function to add two numbers", "code"),
+    ("Find the file 'notes.txt' in my Documents folder", "files"),
+    ("Tell me something random about the ocean", "talk"),
+    ("Search the web for cheap flights to Paris", "web"),
+    ("Check if 'budget.xlsx' is on my drive", "files"),
+    ("Write a Python script to count words in a text file", "code"),
+    ("How's it going today?", "talk"),
+    ("Find recent X posts about AI advancements", "web"),
+    ("Move all .jpg files from Downloads to a 'Photos' folder", "files"),
+    ("Search online for the best laptops of 2025", "web"),
+    ("What's the funniest thing you've heard lately?", "talk"),
+    ("Write a Ruby script to generate random numbers", "code"),
+    ("Hey, how's everything with you?", "talk"),
+    ("Locate 'meeting_agenda.docx' in my system", "files"),
+    ("Search the web for tips on growing indoor plants", "web"),
+    ("Write a C++ program to calculate the sum of an array", "code"),
+    ("Tell me a fun fact about dogs", "talk"),
+    ("Check if the folder 'Old_Projects' exists on my desktop", "files"),
+    ("Browse the web for the latest gaming console reviews", "web"),
+    ("Hi, how are you feeling today?", "talk"),
+    ("Write a Python script to check disk space", "code"),
+    ("Find the file 'vacation_itinerary.pdf' on my drive", "files"),
+    ("Search the web for news on renewable energy", "web"),
+    ("What's the strangest thing you've learned recently?", "talk"),
+    ("Organize all video files into a 'Videos' folder", "files"),
+    ("Write a shell script to delete temporary files", "code"),
+    ("Hey, how's your week been so far?", "talk"),
+    ("Search online for the top movies of 2025", "web"),
+    ("Locate 'taxes_2024.xlsx' in my Documents folder", "files"),
+    ("Tell me about a cool invention from history", "talk"),
+    ("Write a Java program to check if a number is even or odd", "code"),
+    ("Find recent X posts about cryptocurrency trends", "web"),
+    ("Hey, you good today?", "talk"),
+    ("Search the web for easy dinner recipes", "web"),
+    ("Check if 'photo_backup.zip' exists on my drive", "files"),
+    ("Write a Python script to rename files with a timestamp", "code"),
+    ("What's your favorite thing about space?", "talk"),
+    ("search for GPU with at least 24gb vram", "web"),
+    ("Browse the web for the latest fitness trends", "web"),
+    ("Move all .docx files to a 'Work' folder", "files"),
+    ("I would like to make a new project called 'new_project'", "files"),
+    ("I would like to setup a new project index as mark2", "files"),
+    ("can you create a 3d js game that run in the browser", "code"),
+    ("can you make a web app in python that use the flask framework", "code"),
+    ("can you build a web server in go that serve a simple html page", "code"),
+    ("can you find out who Jacky yougouri is ?", "web"),
+    ("Can you use MCP to find stock market for IBM ?", "mcp"),
+    ("Can you use MCP to to export my contacts to a csv file?", "mcp"),
+    ("Can you use a MCP to find write notes to flomo", "mcp"),
+    ("Can you use a MCP to query my calendar and find the next meeting?", "mcp"),
+    ("Can you use a mcp to get the distance between Shanghai and Paris?", "mcp"),
+    ("Setup a new flutter project called 'new_flutter_project'", "files"),
+    ("can you create a new project called 'new_project'", "files"),
+    ("can you make a simple web app that display a list of files in my dir", "code"),
+    ("can you build a simple web server in python that serve a html page", "code"),
+    ("find and buy me the latest rtx 4090", "web"),
+    ("What are some good netflix show like Altered Carbon ?", "web"),
+    ("can you find the latest research paper on AI", "web"),
+    ("can you find research.pdf in my drive", "files"),
+    ("hi", "talk"),
+    ("hello", "talk"),
+    ("buatkan website kalkulator", "code"),
+    ("buat website portfolio", "code"),
+    ("buatkan aplikasi web todo list", "code"),
+    ("buat halaman web sederhana", "code"),
+    ("buatkan kode website landing page", "code"),
+    ("buat program python", "code"),
+    ("buatkan script untuk download file", "code"),
+    ("buat game snake dengan python", "code"),
+    ("buatkan API dengan flask", "code"),
+    ("buat website e-commerce", "code"),
+    ("buatkan bot telegram", "code"),
+    ("buat website dengan HTML CSS JavaScript", "code"),
+    ("buatkan web server golang", "code"),
+    ("coding website chat", "code"),
+    ("buat form login HTML", "code"),
+    ("halo apa kabar", "talk"),
+    ("siapa kamu", "talk"),
+    ("ceritakan lelucon", "talk"),
+    ("cari informasi tentang AI", "web"),
+    ("cari berita terbaru", "web"),
+    ("cari harga laptop murah", "web"),
+    ("carikan website drama China", "web"),
+    ("carikan website drama Korea", "web"),
+    ("carikan situs streaming anime", "web"),
+    ("cari website nonton film gratis", "web"),
+    ("carikan informasi tentang laptop gaming", "web"),
+    ("cari tutorial Python online", "web"),
+    ("carikan harga HP Samsung terbaru", "web"),
+    ("cari resep masakan Indonesia", "web"),
+    ("temukan website belajar bahasa Inggris", "web"),
+    ("carikan berita teknologi terbaru", "web"),
+    ("cari hotel murah di Bali", "web"),
+    ("carikan tiket pesawat Jakarta Surabaya", "web"),
+    ("cari review laptop Asus terbaru", "web"),
+    ("carikan jadwal bioskop hari ini", "web"),
+    ("cari website download lagu", "web"),
+    ("temukan artikel tentang kesehatan", "web"),
+    ("carikan situs belanja online terpercaya", "web"),
+    ("temukan file bernama data.csv", "files"),
+    ("cari file laporan.pdf di drive", "files"),
+    ("buat folder baru bernama proyek", "files"),
+    ("analisis data penjualan", "data"),
+    ("buat grafik dari data CSV", "data"),
+    ("analisis file data.csv", "data"),
+    ("buat chart perbandingan", "data"),
+    ("hitung statistik dari dataset", "data"),
+    ("buat dashboard data", "data"),
+    ("olah data excel", "data"),
+    ("buat visualisasi data", "data"),
+    ("analisis tren penjualan bulanan", "data"),
+    ("buat pie chart dari data", "data"),
+    ("analyze this CSV file", "data"),
+    ("create a chart from the data", "data"),
+    ("build a data dashboard", "data"),
+    ("calculate statistics", "data"),
+    ("make a bar chart", "data"),
+    ("desain landing page modern", "design"),
+    ("buat UI yang bagus", "design"),
+    ("desain halaman login", "design"),
+    ("buat tampilan website yang menarik", "design"),
+    ("redesign halaman utama", "design"),
+    ("buat design form registrasi", "design"),
+    ("buat mockup website", "design"),
+    ("desain dashboard admin yang modern", "design"),
+    ("design a beautiful homepage", "design"),
+    ("create a modern UI design", "design"),
+    ("make a beautiful landing page", "design"),
+    ("design a login page with glassmorphism", "design"),
+    ("buat desain kartu produk", "design"),
+    ("desain navigation bar yang responsif", "design"),
+    ("riset mendalam tentang AI terbaru", "research"),
+    ("lakukan research tentang kompetitor", "research"),
+    ("riset pasar untuk produk baru", "research"),
+    ("kumpulkan data dari internet tentang startup", "research"),
+    ("deep research about machine learning trends", "research"),
+    ("research competitors in the market", "research"),
+    ("do market research for SaaS products", "research"),
+    ("riset dan analisis teknologi blockchain", "research"),
+    ("kumpulkan informasi lengkap tentang perusahaan", "research"),
+    ("lakukan analisis komprehensif tentang industri", "research"),
+)
+
+
+def _dedupe_examples(few_shots: Tuple[Tuple[str, str], ...]) -> Tuple[List[str], List[str]]:
+    """Drop repeated example texts (first label wins) so the classifier indexes each once."""
+    seen = {}
+    for text, label in few_shots:
+        seen.setdefault(text, label)
+    return list(seen.keys()), list(seen.values())
+
+# Bare greetings always go to the casual agent; no need to run the classifiers.
+_GREETINGS = frozenset({"hi", "hello", "hey", "halo", "hai", "hallo", "hei"})
+_COMPLEXITY_LABELS = frozenset({"HIGH", "LOW"})
+
+_ROUTER_PATH = "../llm_router" if __name__ == "__main__" else "./llm_router"
+
+# Probed once at import; the available accelerator does not change while the process runs.
+_DEVICE = "mps" if torch.backends.mps.is_available() else "cuda:0" if torch.cuda.is_available() else "cpu"
+
+_TASK_AGENT_TYPES = {
+    "talk": "casual_agent",
+    "code": "code_agent",
+    "coding": "code_agent",
+    "web": "browser_agent",
+    "files": "file_agent",
+    "mcp": "mcp_agent",
+    "research": "research_agent",
+    "data": "data_agent",
+    "design": "design_agent",
+}
+
+# Keyword tables for the rule-based routing in AgentRouter.select_agent.
+_ACTION_WORDS = frozenset({
+    'buatkan', 'buat', 'bikin', 'bikinkan', 'tolong', 'coba',
+    'create', 'make', 'build', 'write', 'develop', 'code', 'coding',
+    'design', 'generate', 'implement', 'setup',
+})
+_CODE_TARGET_WORDS = frozenset({
+    'website', 'web', 'halaman', 'page', 'landing', 'html',
+    'program', 'script', 'aplikasi', 'app', 'game', 'bot',
+    'api', 'server', 'backend', 'frontend', 'fullstack',
+    'kalkulator', 'calculator', 'form', 'login', 'dashboard',
+    'portfolio', 'profil', 'profile', 'profolio', 'portofolio',
+    'toko', 'shop', 'ecommerce', 'blog', 'cms', 'crud',
+    'database', 'chat', 'todo', 'todolist', 'to-do',
+})
+_CODE_PHRASE_KEYWORDS = (
+    'coding', 'write code', 'tulis kode', 'debug', 'perbaiki kode',
+    'fix code', 'fix error', 'perbaiki error',
+)
+_WEB_SEARCH_KEYWORDS = (
+    'cari di internet', 'cari di web', 'browse', 'search online',
+    'cari informasi', 'cari berita', 'cari harga', 'cari referensi',
+    'search the web', 'find online', 'look up',
+    'cari di google', 'googling', 'search for',
+)
+_WEB_ACTION_WORDS = frozenset({
+    'carikan', 'cari', 'temukan', 'carilah', 'tolong carikan',
+    'search', 'find', 'lookup', 'browse', 'googling',
+})
+_WEB_TARGET_WORDS = frozenset({
+    'website', 'web', 'situs', 'link', 'artikel', 'berita',
+    'informasi', 'info', 'harga', 'drama', 'film', 'movie',
+    'video', 'musik', 'lagu', 'resep', 'recipe', 'review',
+    'tutorial', 'news', 'price', 'toko', 'shop', 'store',
+    'hotel', 'tiket', 'ticket', 'jadwal', 'schedule',
+    'cuaca', 'weather', 'stock', 'saham', 'crypto',
+    'anime', 'manga', 'novel', 'buku', 'book',
+})
+_DESIGN_KEYWORDS = frozenset({
+    'desain', 'design', 'redesign', 'mockup', 'wireframe',
+    'ui', 'ux', 'tampilan', 'layout', 'glassmorphism', 'neumorphism',
+})
+_DESIGN_PHRASES = (
+    'buat ui', 'buat tampilan', 'desain halaman', 'design page',
+    'buat design', 'modern design', 'beautiful page', 'desain website',
+)
+_DATA_KEYWORDS = frozenset({
+    'analisis', 'analyze', 'analysis', 'statistik', 'statistics',
+    'chart', 'grafik', 'graph', 'dashboard', 'visualisasi', 'visualization',
+    'dataset', 'csv', 'excel', 'pivot',
+})
+_DATA_PHRASES = (
+    'analisis data', 'buat chart', 'buat grafik', 'data analysis',
+    'olah data', 'hitung statistik', 'buat dashboard data',
+)
+_RESEARCH_KEYWORDS = frozenset({'riset', 'research', 'investigasi', 'investigation'})
+_RESEARCH_PHRASES = (
+    'riset mendalam', 'deep research', 'riset pasar', 'market research',
+    'analisis kompetitor', 'competitor analysis', 'literature review',
+    'kumpulkan data dari internet', 'lakukan riset',
+)
+
+
+def _phrase_matcher(phrases: Tuple[str, ...]) -> re.Pattern:
+    # One compiled alternation scans the text once instead of one substring search per phrase.
+    return re.compile("|".join(map(re.escape, phrases)))
+
+
+_CODE_PHRASE_RE = _phrase_matcher(_CODE_PHRASE_KEYWORDS)
+_WEB_SEARCH_RE = _phrase_matcher(_WEB_SEARCH_KEYWORDS)
+_DESIGN_PHRASE_RE = _phrase_matcher(_DESIGN_PHRASES)
+_DATA_PHRASE_RE = _phrase_matcher(_DATA_PHRASES)
+_RESEARCH_PHRASE_RE = _phrase_matcher(_RESEARCH_PHRASES)
+
+
+def _rebuild_prototype_index(classifier: AdaptiveClassifier) -> None:
+    """Rebuild the prototype index now rather than on a later predict() call.
+
+    The memory only rebuilds its faiss index every `prototype_update_frequency`
+    additions, so after the few-shot setup the tail of the examples would otherwise
+    be missing from the index until the first live query pays for the rebuild.
+    """
+    memory = getattr(classifier, "memory", None)
+    if memory is not None and hasattr(memory, "_rebuild_index"):
+        memory._rebuild_index()
+
+
+@functools.lru_cache(maxsize=2)
+def _load_classifier(path: str) -> AdaptiveClassifier:
+    return AdaptiveClassifier.from_pretrained(path)
+
+
+def _fork_classifier(base: AdaptiveClassifier) -> AdaptiveClassifier:
+    """Copy a cached classifier with its own example memory but the same frozen encoder."""
+    memo = {}
+    for shared in (getattr(base, "model", None), getattr(base, "tokenizer", None)):
+        if shared is not None:
+            memo[id(shared)] = shared
+    return copy.deepcopy(base, memo)
+
+
+class _SharedEmbedder:
+    """One-entry embedding cache shared by classifier heads that use the same encoder."""
+    def __init__(self, embed):
+        self._embed = embed
+        self._last = (None, None)
+
+    def prime(self, texts: List[str], embeddings: List[torch.Tensor]) -> None:
+        self._last = (tuple(texts), list(embeddings))
+
+    def __call__(self, texts: List[str]) -> List[torch.Tensor]:
+        key = tuple(texts)
+        last_key, last_value = self._last
+        if key != last_key:
+            last_value = self._embed(texts)
+            self._last = (key, last_value)
+        return list(last_value)
+
+
 class AgentRouter:
     """
     AgentRouter is a class that selects the appropriate agent based on the user query.
     """
+    __slots__ = (
+        "agents",
+        "_agents_by_type",
+        "_fallback_agent",
+        "logger",
+        "lang_analysis",
+        "talk_classifier",
+        "complexity_classifier",
+        "_llm_router_cached",
+        "_estimate_complexity_cached",
+        "asked_clarify",
+    )
+
     def __init__(self, agents: list, supported_language: List[str] = ["en", "fr", "zh"]):
         self.agents = agents
+        self._agents_by_type = {}
+        for agent in agents:
+            self._agents_by_type.setdefault(agent.type, agent)
+        self._fallback_agent = self._agents_by_type.get("casual_agent", agents[0] if agents else None)
         self.logger = Logger("router.log")
         self.lang_analysis = LanguageUtility(supported_language=supported_language)
-        self.pipelines = self.load_pipelines()
         self.talk_classifier = self.load_llm_router()
         self.complexity_classifier = self.load_llm_router()
+        if self.talk_classifier.model is self.complexity_classifier.model:
+            # Same frozen encoder: embed each query once and reuse it for both heads.
+            embedder = _SharedEmbedder(self.talk_classifier._get_embeddings)
+            self.talk_classifier._get_embeddings = embedder
+            self.complexity_classifier._get_embeddings = embedder
+        # Both classifiers are frozen after the few-shot setup below, so their answers
+        # depend only on the text and repeated prompts can skip the forward pass.
+        self._llm_router_cached = functools.lru_cache(maxsize=2048)(self._llm_router_impl)
+        self._estimate_complexity_cached = functools.lru_cache(maxsize=2048)(self._estimate_complexity_impl)
         self.learn_few_shots_tasks()
         self.learn_few_shots_complexity()
         self.asked_clarify = False
     
-    def load_pipelines(self) -> Dict[str, Type[pipeline]]:
-        """
-        Load the pipelines for the text classification used for routing.
-        returns:
-            Dict[str, Type[pipeline]]: The loaded pipelines
-        """
-        animate_thinking("Loading zero-shot pipeline...", color="status")
-        return {
-            "bart": pipeline("zero-shot-classification", model="facebook/bart-large-mnli")
-        }
-
     def load_llm_router(self) -> AdaptiveClassifier:
         """
         Load the LLM router model.
@@ -53,508 +581,121 @@ class AgentRouter:
         exceptions:
             Exception: If the safetensors fails to load
         """
-        path = "../llm_router" if __name__ == "__main__" else "./llm_router"
+        path = _ROUTER_PATH
         try:
             animate_thinking("Loading LLM router model...", color="status")
-            talk_classifier = AdaptiveClassifier.from_pretrained(path)
+            talk_classifier = _fork_classifier(_load_classifier(path))
         except Exception as e:
             raise Exception("Failed to load the routing model. Please run the dl_safetensors.sh script inside llm_router/ directory to download the model.")
         return talk_classifier
 
     def get_device(self) -> str:
-        if torch.backends.mps.is_available():
-            return "mps"
-        elif torch.cuda.is_available():
-            return "cuda:0"
-        else:
-            return "cpu"
+        return _DEVICE
     
+    def _load_few_shot_embeddings(self, texts: List[str]) -> None:
+        """
+        Prime the shared embedder with the few-shot embeddings, reading them from disk when
+        a previous run cached them and computing and caching them otherwise.
+        """
+        embedder = self.talk_classifier._get_embeddings
+        if not isinstance(embedder, _SharedEmbedder):
+            return
+        # Keyed on the encoder as well as the texts, so a different router model never
+        # reuses stale vectors.
+        encoder = getattr(self.talk_classifier.model.config, "_name_or_path", "")
+        digest = hashlib.sha1("\n".join([encoder, *texts]).encode("utf-8")).hexdigest()[:16]
+        cache_path = os.path.join(_ROUTER_PATH, f"fewshot_{digest}.pt")
+        try:
+            embedder.prime(texts, list(torch.load(cache_path)))
+            return
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            self.logger.warning(f"Ignoring unreadable few-shot cache {cache_path}: {str(e)}")
+        embeddings = embedder(texts)
+        try:
+            tmp_path = f"{cache_path}.tmp"
+            torch.save(torch.stack(embeddings), tmp_path)
+            os.replace(tmp_path, cache_path)
+        except OSError as e:
+            self.logger.warning(f"Could not cache few-shot embeddings: {str(e)}")
+
     def learn_few_shots_complexity(self) -> None:
-        few_shots = [
-            ("hi", "LOW"),
-            ("How it's going ?", "LOW"),
-            ("What's the weather like today?", "LOW"),
-            ("Can you find a file named 'notes.txt' in my Documents folder?", "LOW"),
-            ("Write a Python script to generate a random password", "LOW"),
-            ("Debug this JavaScript code that's not running properly", "LOW"),
-            ("Search the web for the cheapest laptop under $500", "LOW"),
-            ("Locate a file called 'report_2024.pdf' on my drive", "LOW"),
-            ("Check if a folder named 'Backups' exists on my system", "LOW"),
-            ("Can you find 'family_vacation.mp4' in my Videos folder?", "LOW"),
-            ("Search my drive for a file named 'todo_list.xlsx'", "LOW"),
-            ("Write a Python function to check if a string is a palindrome", "LOW"),
-            ("Can you search the web for startups in Berlin?", "LOW"),
-            ("Find recent articles on blockchain technology online", "LOW"),
-            ("Check if 'Personal_Projects' folder exists on my desktop", "LOW"),
-            ("Create a bash script to list all running processes", "LOW"),
-            ("Debug this Python script that's crashing on line 10", "LOW"),
-            ("Browse the web to find out who invented Python", "LOW"),
-            ("Locate a file named 'shopping_list.txt' on my system", "LOW"),
-            ("Search the web for tips on staying productive", "LOW"),
-            ("Find 'sales_pitch.pptx' in my Downloads folder", "LOW"),
-            ("can you find a file called resume.docx on my drive?", "LOW"),
-            ("can you write a python script to check if the device on my network is connected to the internet", "LOW"),
-            ("can you debug this Java code? It's not working.", "LOW"),
-            ("can you find the old_project.zip file somewhere on my drive?", "LOW"),
-            ("can you locate the backup folder I created last month on my system?", "LOW"),
-            ("could you check if the presentation.pdf file exists in my downloads?", "LOW"),
-            ("search my drive for a file called vacation_photos_2023.jpg.", "LOW"),
-            ("help me organize my desktop files into folders by type.", "LOW"),
-            ("make a blackjack in golang", "LOW"),
-            ("write a python script to ping a website", "LOW"),
-            ("write a simple Java program to print 'Hello World'", "LOW"),
-            ("write a Java program to calculate the area of a circle", "LOW"),
-            ("write a Python function to sort a list of dictionaries by key", "LOW"),
-            ("can you search for startup in tokyo?", "LOW"),
-            ("find the latest updates on quantum computing on the web", "LOW"),
-            ("check if the folder 'Work_Projects' exists on my desktop", "LOW"),
-            (" can you browse the web, use overpass-turbo to show fountains in toulouse", "LOW"),
-            ("search the web for the best budget smartphones of 2025", "LOW"),
-            ("write a Python script to download all images from a webpage", "LOW"),
-            ("create a bash script to monitor CPU usage", "LOW"),
-            ("debug this C++ code that keeps crashing", "LOW"),
-            ("can you browse the web to find out who fosowl is ?", "LOW"),
-            ("find the file 'important_notes.txt'", "LOW"),
-            ("search the web for the best ways to learn a new language", "LOW"),
-            ("locate the file 'presentation.pptx' in my Documents folder", "LOW"),
-            ("Make a 3d game in javascript using three.js", "LOW"),
-            ("Find the latest research papers on AI and build save in a file", "HIGH"),
-            ("Make a web server in go that serve a simple html page", "LOW"),
-            ("Search the web for the cheapest 4K monitor and provide a link", "LOW"),
-            ("Write a JavaScript function to reverse a string", "LOW"),
-            ("Can you locate a file called 'budget_2025.xlsx' on my system?", "LOW"),
-            ("Search the web for recent articles on space exploration", "LOW"),
-            ("when is the exam period for master student in france?", "LOW"),
-            ("Check if a folder named 'Photos_2024' exists on my desktop", "LOW"),
-            ("Can you look up some nice knitting patterns on that web thingy?", "LOW"),
-            ("Goodness, check if my 'Photos_Grandkids' folder is still on the desktop", "LOW"),
-            ("Create a Python script to rename all files in a folder based on their creation date", "LOW"),
-            ("Can you find a file named 'meeting_notes.txt' in my Downloads folder?", "LOW"),
-            ("Write a Go program to check if a port is open on a network", "LOW"),
-            ("Search the web for the latest electric car reviews", "LOW"),
-            ("Write a Python function to merge two sorted lists", "LOW"),
-            ("Create a bash script to monitor disk space and alert via text file", "LOW"),
-            ("What's out there on the web about cheap travel spots?", "LOW"),
-            ("Search X for posts about AI ethics and summarize them", "LOW"),
-            ("Check if a file named 'project_proposal.pdf' exists in my Documents", "LOW"),
-            ("Search the web for tips on improving coding skills", "LOW"),
-            ("Write a Python script to count words in a text file", "LOW"),
-            ("Search the web for restaurant", "LOW"),
-            ("Use a MCP to find the latest stock market data", "LOW"),
-            ("Use a MCP to send an email to my boss", "LOW"),
-            ("Could you use a MCP to find the latest news on climate change?", "LOW"),
-            ("Create a simple HTML page with CSS styling", "LOW"),
-            ("Use file.txt and then use it to ...", "HIGH"),
-            ("Yo, what's good? Find my 'mixtape.mp3' real quick", "LOW"),
-            ("Can you follow the readme and install the project", "HIGH"),
-            ("Man, write me a dope Python script to flex some random numbers", "LOW"),
-            ("Search the web for peer-reviewed articles on gene editing", "LOW"),
-            ("Locate 'meeting_notes.docx' in Downloads, I'm late for this call", "LOW"),
-            ("Make the game less hard", "LOW"),
-            ("Why did it fail?", "LOW"),
-            ("Write a Python script to list all .pdf files in my Documents", "LOW"),
-            ("Write a Python thing to sort my .jpg files by date", "LOW"),
-            ("make a snake game please", "LOW"),
-            ("Find 'gallery_list.pdf', then build a web app to show my pics", "HIGH"),
-            ("Find 'budget_2025.xlsx', analyze it, and make a chart for my boss", "HIGH"),
-            ("I want you to make me a plan to travel to Tainan", "HIGH"),
-            ("Retrieve the latest publications on CRISPR and develop a web application to display them", "HIGH"),
-            ("Bro dig up a music API and build me a tight app for the hottest tracks", "HIGH"),
-            ("Find a public API for sports scores and build a web app to show live updates", "HIGH"),
-            ("Find a public API for book data and create a Flask app to list bestsellers", "HIGH"),
-            ("Organize my desktop files by extension and then write a script to list them", "HIGH"),
-            ("Find the latest research on renewable energy and build a web app to display it", "HIGH"),
-            ("search online for popular sci-fi movies from 2024 and pick three to watch tonight. Save the list in movie_night.txt", "HIGH"),
-            ("can you find vitess repo, clone it and install by following the readme", "HIGH"),
-            ("Create a JavaScript game using Phaser.js with multiple levels", "HIGH"),
-            ("Search the web for the latest trends in web development and build a sample site", "HIGH"),
-            ("Use my research_note.txt file, double check the informations on the web", "HIGH"),
-            ("Make a web server in go that query a flight API and display them in a app", "HIGH"),
-            ("Search the web for top cafes in Rennes, France, and save a list of three with their addresses in rennes_cafes.txt.", "HIGH"),
-            ("Search the web for the latest trends in AI and demo it in pytorch", "HIGH"),
-            ("can you lookup for api that track flight and build a web flight tracking app", "HIGH"),
-            ("Find the file toto.pdf then use its content to reply to Jojo on superforum.com", "HIGH"),
-            ("Create a whole web app in python using the flask framework that query news API", "HIGH"),
-            ("Create a bash script that monitor the CPU usage and send an email if it's too high", "HIGH"),
-            ("Make a web search for latest news on the stock market and display them with python", "HIGH"),
-            ("Find my resume file, apply to job that might fit online", "HIGH"),
-            ("Can you find a weather API and build a Python app to display current weather", "HIGH"),
-            ("Create a Python web app using Flask to track cryptocurrency prices from an API", "HIGH"),
-            ("Search the web for tutorials on machine learning and build a simple ML model in Python", "HIGH"),
-            ("Find a public API for movie data and build a web app to display movie ratings", "HIGH"),
-            ("Create a Node.js server that queries a public API for traffic data and displays it", "HIGH"),
-            ("can you find api and build a python web app with it ?", "HIGH"),
-            ("do a deep search of current AI player for 2025 and make me a report in a file", "HIGH"),
-            ("Find a public API for recipe data and build a web app to display recipes", "HIGH"),
-            ("Search the web for recent space mission updates and build a Flask app", "HIGH"),
-            ("Create a Python script to scrape a website and save data to a database", "HIGH"),
-            ("Find a shakespear txt then train a transformers on it to generate text", "HIGH"),
-            ("Find a public API for fitness tracking and build a web app to show stats", "HIGH"),
-            ("Search the web for tutorials on web development and build a sample site", "HIGH"),
-            ("Create a Node.js app to query a public API for event listings and display them", "HIGH"),
-            ("Find a file named 'budget.xlsx', analyze its data, and generate a chart", "HIGH"),
-            ("buatkan website kalkulator", "LOW"),
-            ("buat game snake python", "LOW"),
-            ("buat halaman web sederhana", "LOW"),
-            ("buatkan script python sederhana", "LOW"),
-            ("buatkan saya website profil portfolio", "LOW"),
-            ("buat website portfolio saya", "LOW"),
-            ("buatkan website toko online", "LOW"),
-            ("buat landing page modern", "LOW"),
-            ("buatkan website profil profolio", "LOW"),
-            ("buatkan saya website blog", "LOW"),
-            ("buat website dashboard admin", "LOW"),
-            ("buatkan form login register", "LOW"),
-            ("buatkan website dan cari referensi online lalu deploy", "HIGH"),
-        ]
-        random.shuffle(few_shots)
-        texts = [text for text, _ in few_shots]
-        labels = [label for _, label in few_shots]
+        texts, labels = _dedupe_examples(_FEWSHOT_COMPLEXITY)
+        self._load_few_shot_embeddings(texts)
         self.complexity_classifier.add_examples(texts, labels)
+        _rebuild_prototype_index(self.complexity_classifier)
 
     def learn_few_shots_tasks(self) -> None:
-        few_shots = [
-            ("Write a python script to check if the device on my network is connected to the internet", "coding"),
-            ("Hey could you search the web for the latest news on the tesla stock market ?", "web"),
-            ("I would like you to search for weather api", "web"),
-            ("Plan a 3-day trip to New York, including flights and hotels.", "web"),
-            ("Find on the web the latest research papers on AI.", "web"),
-            ("Can you debug this Java code? It's not working.", "code"),
-            ("Can you browse the web and find me a 4090 for cheap?", "web"),
-            ("i would like to setup a new AI project, index as mark2", "files"),
-            ("Hey, can you find the old_project.zip file somewhere on my drive?", "files"),
-            ("Tell me a funny story", "talk"),
-            ("can you make a snake game in python", "code"),
-            ("Can you locate the backup folder I created last month on my system?", "files"),
-            ("Share a random fun fact about space.", "talk"),
-            ("Write a script to rename all files in a directory to lowercase.", "files"),
-            ("Could you check if the presentation.pdf file exists in my downloads?", "files"),
-            ("Tell me about the weirdest dream you've ever heard of.", "talk"),
-            ("Search my drive for a file called vacation_photos_2023.jpg.", "files"),
-            ("Help me organize my desktop files into folders by type.", "files"),
-            ("What's your favorite movie and why?", "talk"),
-            ("what directory are you in ?", "files"),
-            ("what files you seing rn ?", "files"),
-            ("When is the period of university exam in france ?", "web"),
-            ("Search my drive for a file named budget_2024.xlsx", "files"),
-            ("Write a Python function to sort a list of dictionaries by key", "code"),
-            ("Find the latest updates on quantum computing on the web", "web"),
-            ("Check if the folder 'Work_Projects' exists on my desktop", "files"),
-            ("Create a bash script to monitor CPU usage", "code"),
-            ("Search online for the best budget smartphones of 2025", "web"),
-            ("What's the strangest food combination you've heard of?", "talk"),
-            ("Move all .txt files from Downloads to a new folder called Notes", "files"),
-            ("Debug this C++ code that keeps crashing", "code"),
-            ("can you browse the web to find out who fosowl is ?", "web"),
-            ("Find the file 'important_notes.txt'", "files"),
-            ("Find out the latest news on the upcoming Mars mission", "web"),
-            ("Write a Java program to calculate the area of a circle", "code"),
-            ("Search the web for the best ways to learn a new language", "web"),
-            ("Locate the file 'presentation.pptx' in my Documents folder", "files"),
-            ("Write a Python script to download all images from a webpage", "code"),
-            ("Search the web for the latest trends in AI and machine learning", "web"),
-            ("Tell me about a time when you had to solve a difficult problem", "talk"),
-            ("Organize all image files on my desktop into a folder called 'Pictures'", "files"),
-            ("Generate a Ruby script to calculate Fibonacci numbers up to 100", "code"),
-            ("Find out what device are connected to my network", "code"),
-            ("Show me how much disk space is left on my drive", "code"),
-            ("Look up recent posts on X about climate change", "web"),
-            ("Find the photo I took last week named sunset_beach.jpg", "files"),
-            ("Write a JavaScript snippet to fetch data from an API", "code"),
-            ("Search the web for tutorials on machine learning with Python", "web"),
-            ("Locate the file 'meeting_notes.docx' in my Documents folder", "files"),
-            ("Write a Python script to scrape a website's title and links", "code"),
-            ("Search the web for the latest breakthroughs in fusion energy", "web"),
-            ("Tell me about a historical event that sounds too wild to be true", "talk"),
-            ("Organize all image files on my desktop into a folder called 'Pictures'", "files"),
-            ("Generate a Ruby script to calculate Fibonacci numbers up to 100", "code"),
-            ("Find recent X posts about SpaceX's next rocket launch", "web"),
-            ("What's the funniest misunderstanding you've seen between humans and AI?", "talk"),
-            ("Check if 'backup_032025.zip' exists anywhere on my drive", "files" ),
-            ("Create a shell script to automate backups of a directory", "code"),
-            ("Look up the top AI conferences happening in 2025 online", "web"),
-            ("Write a C# program to simulate a basic calculator", "code"),
-            ("Browse the web for open-source alternatives to Photoshop", "web"),
-            ("Hey how are you", "talk"),
-            ("Write a Python script to ping a website", "code"),
-            ("Search the web for the latest iPhone release", "web"),
-            ("What's the weather like today?", "web"),
-            ("Hi, how's your day going?", "talk"),
-            ("Can you find a file called resume.docx on my drive?", "files"),
-            ("Write a simple Java program to print 'Hello World'", "code"),
-            ("can you find the current stock of Tesla?", "web"),
-            ("Tell me a quick joke", "talk"),
-            ("Search online for the best coffee shops in Seattle", "web"),
-            ("Check if 'project_plan.pdf' exists in my Downloads folder", "files"),
-            ("What's your favorite color?", "talk"),
-            ("Write a bash script to list all files in a directory", "code"),
-            ("Find recent X posts about electric cars", "web"),
-            ("Hey, you doing okay?", "talk"),
-            ("Locate the file 'family_photo.jpg' on my system", "files"),
-            ("Search the web for beginner guitar lessons", "web"),
-            ("Write a Python function to reverse a string", "code"),
-            ("What's the weirdest animal you know of?", "talk"),
-            ("Organize all .pdf files on my desktop into a 'Documents' folder", "files"),
-            ("Browse the web for the latest space mission updates", "web"),
-            ("Hey, what's up with you today?", "talk"),
-            ("Write a JavaScript function to add two numbers", "code"),
-            ("Find the file 'notes.txt' in my Documents folder", "files"),
-            ("Tell me something random about the ocean", "talk"),
-            ("Search the web for cheap flights to Paris", "web"),
-            ("Check if 'budget.xlsx' is on my drive", "files"),
-            ("Write a Python script to count words in a text file", "code"),
-            ("How's it going today?", "talk"),
-            ("Find recent X posts about AI advancements", "web"),
-            ("Move all .jpg files from Downloads to a 'Photos' folder", "files"),
-            ("Search online for the best laptops of 2025", "web"),
-            ("What's the funniest thing you've heard lately?", "talk"),
-            ("Write a Ruby script to generate random numbers", "code"),
-            ("Hey, how's everything with you?", "talk"),
-            ("Locate 'meeting_agenda.docx' in my system", "files"),
-            ("Search the web for tips on growing indoor plants", "web"),
-            ("Write a C++ program to calculate the sum of an array", "code"),
-            ("Tell me a fun fact about dogs", "talk"),
-            ("Check if the folder 'Old_Projects' exists on my desktop", "files"),
-            ("Browse the web for the latest gaming console reviews", "web"),
-            ("Hi, how are you feeling today?", "talk"),
-            ("Write a Python script to check disk space", "code"),
-            ("Find the file 'vacation_itinerary.pdf' on my drive", "files"),
-            ("Search the web for news on renewable energy", "web"),
-            ("What's the strangest thing you've learned recently?", "talk"),
-            ("Organize all video files into a 'Videos' folder", "files"),
-            ("Write a shell script to delete temporary files", "code"),
-            ("Hey, how's your week been so far?", "talk"),
-            ("Search online for the top movies of 2025", "web"),
-            ("Locate 'taxes_2024.xlsx' in my Documents folder", "files"),
-            ("Tell me about a cool invention from history", "talk"),
-            ("Write a Java program to check if a number is even or odd", "code"),
-            ("Find recent X posts about cryptocurrency trends", "web"),
-            ("Hey, you good today?", "talk"),
-            ("Search the web for easy dinner recipes", "web"),
-            ("Check if 'photo_backup.zip' exists on my drive", "files"),
-            ("Write a Python script to rename files with a timestamp", "code"),
-            ("What's your favorite thing about space?", "talk"),
-            ("search for GPU with at least 24gb vram", "web"),
-            ("Browse the web for the latest fitness trends", "web"),
-            ("Move all .docx files to a 'Work' folder", "files"),
-            ("I would like to make a new project called 'new_project'", "files"),
-            ("I would like to setup a new project index as mark2", "files"),
-            ("can you create a 3d js game that run in the browser", "code"),
-            ("can you make a web app in python that use the flask framework", "code"),
-            ("can you build a web server in go that serve a simple html page", "code"),
-            ("can you find out who Jacky yougouri is ?", "web"),
-            ("Can you use MCP to find stock market for IBM ?", "mcp"),
-            ("Can you use MCP to to export my contacts to a csv file?", "mcp"),
-            ("Can you use a MCP to find write notes to flomo", "mcp"),
-            ("Can you use a MCP to query my calendar and find the next meeting?", "mcp"),
-            ("Can you use a mcp to get the distance between Shanghai and Paris?", "mcp"),
-            ("Setup a new flutter project called 'new_flutter_project'", "files"),
-            ("can you create a new project called 'new_project'", "files"),
-            ("can you make a simple web app that display a list of files in my dir", "code"),
-            ("can you build a simple web server in python that serve a html page", "code"),
-            ("find and buy me the latest rtx 4090", "web"),
-            ("What are some good netflix show like Altered Carbon ?", "web"),
-            ("can you find the latest research paper on AI", "web"),
-            ("can you find research.pdf in my drive", "files"),
-            ("hi", "talk"),
-            ("hello", "talk"),
-            ("buatkan website kalkulator", "code"),
-            ("buat website portfolio", "code"),
-            ("buatkan aplikasi web todo list", "code"),
-            ("buat halaman web sederhana", "code"),
-            ("buatkan kode website landing page", "code"),
-            ("buat program python", "code"),
-            ("buatkan script untuk download file", "code"),
-            ("buat game snake dengan python", "code"),
-            ("buatkan API dengan flask", "code"),
-            ("buat website e-commerce", "code"),
-            ("buatkan bot telegram", "code"),
-            ("buat website dengan HTML CSS JavaScript", "code"),
-            ("buatkan web server golang", "code"),
-            ("coding website chat", "code"),
-            ("buat form login HTML", "code"),
-            ("halo apa kabar", "talk"),
-            ("siapa kamu", "talk"),
-            ("ceritakan lelucon", "talk"),
-            ("cari informasi tentang AI", "web"),
-            ("cari berita terbaru", "web"),
-            ("cari harga laptop murah", "web"),
-            ("carikan website drama China", "web"),
-            ("carikan website drama Korea", "web"),
-            ("carikan situs streaming anime", "web"),
-            ("cari website nonton film gratis", "web"),
-            ("carikan informasi tentang laptop gaming", "web"),
-            ("cari tutorial Python online", "web"),
-            ("carikan harga HP Samsung terbaru", "web"),
-            ("cari resep masakan Indonesia", "web"),
-            ("temukan website belajar bahasa Inggris", "web"),
-            ("carikan berita teknologi terbaru", "web"),
-            ("cari hotel murah di Bali", "web"),
-            ("carikan tiket pesawat Jakarta Surabaya", "web"),
-            ("cari review laptop Asus terbaru", "web"),
-            ("carikan jadwal bioskop hari ini", "web"),
-            ("cari website download lagu", "web"),
-            ("temukan artikel tentang kesehatan", "web"),
-            ("carikan situs belanja online terpercaya", "web"),
-            ("temukan file bernama data.csv", "files"),
-            ("cari file laporan.pdf di drive", "files"),
-            ("buat folder baru bernama proyek", "files"),
-            ("analisis data penjualan", "data"),
-            ("buat grafik dari data CSV", "data"),
-            ("analisis file data.csv", "data"),
-            ("buat chart perbandingan", "data"),
-            ("hitung statistik dari dataset", "data"),
-            ("buat dashboard data", "data"),
-            ("olah data excel", "data"),
-            ("buat visualisasi data", "data"),
-            ("analisis tren penjualan bulanan", "data"),
-            ("buat pie chart dari data", "data"),
-            ("analyze this CSV file", "data"),
-            ("create a chart from the data", "data"),
-            ("build a data dashboard", "data"),
-            ("calculate statistics", "data"),
-            ("make a bar chart", "data"),
-            ("desain landing page modern", "design"),
-            ("buat UI yang bagus", "design"),
-            ("desain halaman login", "design"),
-            ("buat tampilan website yang menarik", "design"),
-            ("redesign halaman utama", "design"),
-            ("buat design form registrasi", "design"),
-            ("buat mockup website", "design"),
-            ("desain dashboard admin yang modern", "design"),
-            ("design a beautiful homepage", "design"),
-            ("create a modern UI design", "design"),
-            ("make a beautiful landing page", "design"),
-            ("design a login page with glassmorphism", "design"),
-            ("buat desain kartu produk", "design"),
-            ("desain navigation bar yang responsif", "design"),
-            ("riset mendalam tentang AI terbaru", "research"),
-            ("lakukan research tentang kompetitor", "research"),
-            ("riset pasar untuk produk baru", "research"),
-            ("kumpulkan data dari internet tentang startup", "research"),
-            ("deep research about machine learning trends", "research"),
-            ("research competitors in the market", "research"),
-            ("do market research for SaaS products", "research"),
-            ("riset dan analisis teknologi blockchain", "research"),
-            ("kumpulkan informasi lengkap tentang perusahaan", "research"),
-            ("lakukan analisis komprehensif tentang industri", "research"),
-        ]
-        random.shuffle(few_shots)
-        texts = [text for text, _ in few_shots]
-        labels = [label for _, label in few_shots]
+        texts, labels = _dedupe_examples(_FEWSHOT_TASKS)
+        self._load_few_shot_embeddings(texts)
         self.talk_classifier.add_examples(texts, labels)
+        _rebuild_prototype_index(self.talk_classifier)
 
-    def llm_router(self, text: str) -> tuple:
+    def _llm_router_impl(self, text: str) -> tuple:
         predictions = self.talk_classifier.predict(text)
-        predictions = [pred for pred in predictions if pred[0] not in ["HIGH", "LOW"]]
-        predictions = sorted(predictions, key=lambda x: x[1], reverse=True)
-        return predictions[0]
-    
+        return max((pred for pred in predictions if pred[0] not in _COMPLEXITY_LABELS), key=itemgetter(1))
+
+    def llm_router(self, text: str) -> tuple:
+        return self._llm_router_cached(text.strip())
+
+    def _estimate_complexity_impl(self, text: str) -> str:
+        predictions = self.complexity_classifier.predict(text)
+        return max(predictions, key=itemgetter(1))[0]
+
     def estimate_complexity(self, text: str) -> str:
         try:
-            predictions = self.complexity_classifier.predict(text)
+            return self._estimate_complexity_cached(text.strip())
         except Exception as e:
             pretty_print(f"Error in estimate_complexity: {str(e)}", color="failure")
             return "LOW"
-        predictions = sorted(predictions, key=lambda x: x[1], reverse=True)
-        return predictions[0][0]
+
+    def route_all(self, text: str) -> Tuple[str, float, str]:
+        """
+        Classify task type and complexity together; the query is embedded once for both.
+        returns:
+            Tuple[str, float, str]: task type, its confidence and the complexity label
+        """
+        task_type, confidence = self.llm_router(text)
+        return task_type, confidence, self.estimate_complexity(text)
 
     def find_planner_agent(self) -> Agent:
-        for agent in self.agents:
-            if agent.type == "planner_agent":
-                return agent
-        return None
+        return self._agents_by_type.get("planner_agent")
 
     def find_agent_for_task(self, task_type: str) -> Agent:
-        agent_type_map = {
-            "talk": "casual_agent",
-            "code": "code_agent",
-            "coding": "code_agent",
-            "web": "browser_agent",
-            "files": "file_agent",
-            "mcp": "mcp_agent",
-            "research": "research_agent",
-            "data": "data_agent",
-            "design": "design_agent",
-        }
-        target_type = agent_type_map.get(task_type)
-        if target_type:
-            for agent in self.agents:
-                if agent.type == target_type:
-                    return agent
-        for agent in self.agents:
-            if agent.type == "casual_agent":
-                return agent
-        return self.agents[0]
+        return self._agents_by_type.get(_TASK_AGENT_TYPES.get(task_type), self._fallback_agent)
 
     def select_agent(self, text: str) -> Agent:
         if text is None or len(text.strip()) == 0:
             return None
 
         text_lower = text.lower()
-        words = set(text_lower.split())
-
-        action_words = {'buatkan', 'buat', 'bikin', 'bikinkan', 'tolong', 'coba',
-                        'create', 'make', 'build', 'write', 'develop', 'code', 'coding',
-                        'design', 'generate', 'implement', 'setup'}
-        code_target_words = {'website', 'web', 'halaman', 'page', 'landing', 'html',
-                             'program', 'script', 'aplikasi', 'app', 'game', 'bot',
-                             'api', 'server', 'backend', 'frontend', 'fullstack',
-                             'kalkulator', 'calculator', 'form', 'login', 'dashboard',
-                             'portfolio', 'profil', 'profile', 'profolio', 'portofolio',
-                             'toko', 'shop', 'ecommerce', 'blog', 'cms', 'crud',
-                             'database', 'chat', 'todo', 'todolist', 'to-do'}
-        code_phrase_keywords = [
-            'coding', 'write code', 'tulis kode', 'debug', 'perbaiki kode',
-            'fix code', 'fix error', 'perbaiki error'
-        ]
-
-        has_action = bool(words & action_words)
-        has_target = bool(words & code_target_words)
-        has_phrase = any(kw in text_lower for kw in code_phrase_keywords)
-
-        web_search_keywords = [
-            'cari di internet', 'cari di web', 'browse', 'search online',
-            'cari informasi', 'cari berita', 'cari harga', 'cari referensi',
-            'search the web', 'find online', 'look up',
-            'cari di google', 'googling', 'search for',
-        ]
-        web_action_words = {'carikan', 'cari', 'temukan', 'carilah', 'tolong carikan',
-                           'search', 'find', 'lookup', 'browse', 'googling'}
-        web_target_words = {'website', 'web', 'situs', 'link', 'artikel', 'berita',
-                           'informasi', 'info', 'harga', 'drama', 'film', 'movie',
-                           'video', 'musik', 'lagu', 'resep', 'recipe', 'review',
-                           'tutorial', 'news', 'price', 'toko', 'shop', 'store',
-                           'hotel', 'tiket', 'ticket', 'jadwal', 'schedule',
-                           'cuaca', 'weather', 'stock', 'saham', 'crypto',
-                           'anime', 'manga', 'novel', 'buku', 'book'}
-
-        has_web_action = bool(words & web_action_words)
-        has_web_target = bool(words & web_target_words)
+        tokens = text_lower.split()
+        words = set(tokens)
+
+        if len(words) == 1 and text_lower.strip(" !?.,") in _GREETINGS:
+            agent = self.find_agent_for_task("talk")
+            pretty_print(f"Sapaan terdeteksi -> {agent.agent_name}", color="info")
+            self.logger.info(f"Greeting detected, routing to {agent.agent_name}")
+            return agent
+
+        has_action = not words.isdisjoint(_ACTION_WORDS)
+        has_target = not words.isdisjoint(_CODE_TARGET_WORDS)
+        has_phrase = _CODE_PHRASE_RE.search(text_lower) is not None
+
+        has_web_action = not words.isdisjoint(_WEB_ACTION_WORDS)
+        has_web_target = not words.isdisjoint(_WEB_TARGET_WORDS)
         is_web_search_by_keyword = has_web_action and has_web_target
-        is_web_task = any(kw in text_lower for kw in web_search_keywords) or is_web_search_by_keyword
+        is_web_task = _WEB_SEARCH_RE.search(text_lower) is not None or is_web_search_by_keyword
 
         is_code_task = (has_action and has_target) or has_phrase
 
-        design_keywords = {'desain', 'design', 'redesign', 'mockup', 'wireframe',
-                          'ui', 'ux', 'tampilan', 'layout', 'glassmorphism', 'neumorphism'}
-        design_phrases = ['buat ui', 'buat tampilan', 'desain halaman', 'design page',
-                         'buat design', 'modern design', 'beautiful page', 'desain website']
-        is_design_task = bool(words & design_keywords) or any(kw in text_lower for kw in design_phrases)
-
-        data_keywords = {'analisis', 'analyze', 'analysis', 'statistik', 'statistics',
-                        'chart', 'grafik', 'graph', 'dashboard', 'visualisasi', 'visualization',
-                        'dataset', 'csv', 'excel', 'pivot'}
-        data_phrases = ['analisis data', 'buat chart', 'buat grafik', 'data analysis',
-                       'olah data', 'hitung statistik', 'buat dashboard data']
-        is_data_task = bool(words & data_keywords) or any(kw in text_lower for kw in data_phrases)
-
-        research_keywords = {'riset', 'research', 'investigasi', 'investigation'}
-        research_phrases = ['riset mendalam', 'deep research', 'riset pasar', 'market research',
-                           'analisis kompetitor', 'competitor analysis', 'literature review',
-                           'kumpulkan data dari internet', 'lakukan riset']
-        is_research_task = any(kw in text_lower for kw in research_phrases) or (
-            bool(words & research_keywords) and len(text_lower.split()) > 4
+        is_design_task = not words.isdisjoint(_DESIGN_KEYWORDS) or _DESIGN_PHRASE_RE.search(text_lower) is not None
+
+        is_data_task = not words.isdisjoint(_DATA_KEYWORDS) or _DATA_PHRASE_RE.search(text_lower) is not None
+
+        is_research_task = _RESEARCH_PHRASE_RE.search(text_lower) is not None or (
+            not words.isdisjoint(_RESEARCH_KEYWORDS) and len(tokens) > 4
         )
 
         if is_research_task:
@@ -590,10 +731,8 @@ class AgentRouter:
             self.logger.info(f"Code task detected by keyword, routing to {agent.agent_name}")
             return agent
 
-        task_type, confidence = self.llm_router(text)
+        task_type, confidence, complexity = self.route_all(text)
         self.logger.info(f"Task classified as '{task_type}' with confidence {confidence:.2f}")
-
-        complexity = self.estimate_complexity(text)
         self.logger.info(f"Task complexity: {complexity}")
 
         if complexity == "HIGH":
@@ -1,3 +1,4 @@
+import ast
 import subprocess
 import time
 import re
@@ -5,10 +6,41 @@ import os
 import tempfile
 import signal
 import resource
+import selectors
+import socket
+import json
+import hashlib
+import threading
+from collections import OrderedDict, deque
 from dataclasses import dataclass, field
+from types import MappingProxyType
 from typing import Optional, List, Dict
 from sources.logger import Logger
 
+try:
+    from re import _parser as sre_parse
+    from re._constants import LITERAL, AT
+except ImportError:  # Python < 3.11
+    import sre_parse
+    from sre_constants import LITERAL, AT
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+try:
+    import hyperscan
+except ImportError:
+    hyperscan = None
+
+# Validation runs on untrusted code, so prefer RE2: it matches in linear time and
+# cannot be driven into catastrophic backtracking.
+try:
+    import re2 as validation_re
+except ImportError:
+    validation_re = re
+
 
 DANGEROUS_PATTERNS = [
     r'\bos\.system\b',
@@ -126,16 +158,19 @@ LANGUAGE_CONFIG = {
     'python': {
         'extension': '.py',
         'command': ['python3'],
+        'stdin': True,
         'patterns': DANGEROUS_PATTERNS,
     },
     'javascript': {
         'extension': '.js',
         'command': ['node'],
+        'stdin': True,
         'patterns': DANGEROUS_JS_PATTERNS,
     },
     'nodejs': {
         'extension': '.js',
         'command': ['node'],
+        'stdin': True,
         'patterns': DANGEROUS_JS_PATTERNS,
     },
     'bash': {
@@ -150,14 +185,452 @@ LANGUAGE_CONFIG = {
     },
 }
 
-MAX_OUTPUT_LENGTH = 50000
-
 RESTRICTED_PATHS = [
     '/etc/passwd', '/etc/shadow', '/etc/sudoers',
     '/root', '/proc', '/sys',
     '/home/runner/.config',
 ]
 
+SYSTEM_INSTALL_PATTERNS = (
+    "apt install", "apt-get install", "apt update", "apt-get update",
+    "brew install", "conda install",
+)
+
+ALLOWED_INSTALL_PATTERNS = (
+    "pip install", "pip3 install",
+    "npm install", "npm i ", "yarn add", "yarn install",
+    "npx ", "npm init", "npm create",
+)
+
+
+def _combine(patterns: List[str]):
+    # One alternation scans the text once instead of one search per pattern; each
+    # pattern keeps its own group so the matching rule can still be identified.
+    if not patterns:
+        return None
+    return validation_re.compile('|'.join(f'(?P<g{i}>{p})' for i, p in enumerate(patterns)))
+
+
+def _automaton(words) -> Optional["ahocorasick.Automaton"]:
+    # Aho-Corasick finds any of the needles in a single pass over the text.
+    if ahocorasick is None:
+        return None
+    automaton = ahocorasick.Automaton()
+    for word in words:
+        automaton.add_word(word, word)
+    automaton.make_automaton()
+    return automaton
+
+
+AC_SYSTEM_INSTALL = _automaton(SYSTEM_INSTALL_PATTERNS)
+AC_ALLOWED_INSTALL = _automaton(ALLOWED_INSTALL_PATTERNS)
+AC_RESTRICTED_PATHS = _automaton(RESTRICTED_PATHS)
+
+
+def _find_any(automaton, needles, text: str) -> Optional[str]:
+    if automaton is not None:
+        for _, found in automaton.iter(text):
+            return found
+        return None
+    for needle in needles:
+        if needle in text:
+            return needle
+    return None
+
+
+def _hyperscan_db(patterns: List[str]):
+    # Hyperscan compiles the whole list into one automaton and scans the text once.
+    if hyperscan is None or not patterns:
+        return None
+    try:
+        db = hyperscan.Database(mode=hyperscan.HS_MODE_BLOCK)
+        db.compile(
+            expressions=[p.encode('utf-8') for p in patterns],
+            ids=list(range(len(patterns))),
+            elements=len(patterns),
+            flags=[hyperscan.HS_FLAG_SOM_LEFTMOST] * len(patterns),
+        )
+        return db
+    except hyperscan.error:
+        return None
+
+
+# A database's scratch space cannot be shared by concurrent scans.
+_HYPERSCAN_LOCK = threading.Lock()
+
+
+def _hyperscan_first_match(db, text: str) -> Optional[str]:
+    data = text.encode('utf-8', errors='replace')
+    found = []
+
+    def on_match(pattern_id, start, end, flags, context):
+        found.append((start, end))
+        return True  # stop at the first match
+
+    with _HYPERSCAN_LOCK:
+        try:
+            db.scan(data, match_event_handler=on_match)
+        except hyperscan.ScanTerminated:
+            pass
+    if not found:
+        return None
+    start, end = found[0]
+    return data[start:end].decode('utf-8', errors='replace')
+
+
+def _required_literal(pattern: str) -> Optional[str]:
+    # The longest run of plain characters that every match of the pattern must contain
+    # (zero-width anchors such as \b do not break a run); None if there is none.
+    parsed = sre_parse.parse(pattern)
+    if parsed.state.flags & re.IGNORECASE:
+        return None
+    best, run = '', ''
+    for op, av in parsed:
+        if op is LITERAL:
+            run += chr(av)
+        elif op is not AT:
+            best, run = max(best, run, key=len), ''
+    return max(best, run, key=len) or None
+
+
+def _required_literals(patterns: List[str]) -> Optional[tuple]:
+    literals = tuple(_required_literal(p) for p in patterns)
+    return None if None in literals else tuple(dict.fromkeys(literals))
+
+
+# Patterns are compiled once at import; validation runs on every executed snippet.
+# Benign code usually contains none of the literal anchors, so a substring prefilter
+# lets validation skip the regex scan entirely.
+DANGEROUS_LITERALS = {lang: _required_literals(cfg['patterns']) for lang, cfg in LANGUAGE_CONFIG.items()}
+AC_DANGEROUS_LITERALS = {lang: _automaton(lits) if lits else None for lang, lits in DANGEROUS_LITERALS.items()}
+HS_DANGEROUS = {lang: _hyperscan_db(cfg['patterns']) for lang, cfg in LANGUAGE_CONFIG.items()}
+COMBINED_DANGEROUS = {lang: _combine(cfg['patterns']) for lang, cfg in LANGUAGE_CONFIG.items()}
+COMBINED_SERVER_START = _combine(SERVER_START_PATTERNS)
+# Every line _strip_python_server_start rewrites contains one of these.
+SERVER_HINT_LITERALS = _required_literals(SERVER_START_PATTERNS) + ('__main__',)
+AC_SERVER_HINTS = _automaton(SERVER_HINT_LITERALS)
+COMPILED_SERVER_INDICATORS = [validation_re.compile(p) for p in (
+    r'from\s+flask\s+import',
+    r'from\s+fastapi\s+import',
+    r'import\s+flask',
+    r'import\s+fastapi',
+    r'app\s*=\s*Flask\s*\(',
+    r'app\s*=\s*FastAPI\s*\(',
+    r'app\.run\s*\(',
+    r'uvicorn\.run\s*\(',
+    r'@app\.route\s*\(',
+    r'@app\.(get|post|put|delete|patch)\s*\(',
+)]
+COMBINED_NETWORK = _combine([
+    r'\bsocket\b', r'\burllib\b', r'\brequests\b', r'\bhttplib\b', r'\bhttp\b',
+])
+# Python is checked on its syntax tree rather than its text, so strings and comments
+# that mention a call are not flagged and aliased imports or getattr() lookups are.
+# Mirrors DANGEROUS_PATTERNS, which stays as the fallback for code that does not parse.
+PY_FORBIDDEN_NAMES = frozenset({
+    'os.system', 'os.popen', 'os.kill', 'os.remove', 'os.unlink', 'os.rmdir', 'os._exit',
+    'shutil.rmtree', 'shutil.move', 'sys.exit', 'pickle.loads',
+    'eval', 'exec', 'compile', '__import__',
+})
+PY_FORBIDDEN_PREFIXES = ('os.exec', 'os.spawn', 'subprocess.', 'socket.', 'signal.SIG')
+PY_FORBIDDEN_MODULES = frozenset({'ctypes', 'importlib', 'marshal'})
+# Reachable from any object (e.g. a builtins alias), so flagged by final attribute name.
+PY_FORBIDDEN_ATTRS = frozenset({'__import__', 'eval', 'exec', 'compile'})
+PY_OPEN_NAMES = frozenset({'open', 'io.open'})
+PY_STAR_IMPORT_BLOCKED = frozenset(
+    name.split('.')[0] for name in PY_FORBIDDEN_NAMES | set(PY_FORBIDDEN_PREFIXES) if '.' in name
+) | PY_FORBIDDEN_MODULES
+
+
+def _strip_builtins(name: str) -> str:
+    for prefix in ('builtins.', '__builtins__.'):
+        if name.startswith(prefix):
+            return name[len(prefix):]
+    return name
+
+
+def _py_forbidden(name: str) -> bool:
+    name = _strip_builtins(name)
+    return (name in PY_FORBIDDEN_NAMES or name.startswith(PY_FORBIDDEN_PREFIXES)
+            or name.split('.', 1)[0] in PY_FORBIDDEN_MODULES)
+
+
+def _py_restricted_literal(node) -> bool:
+    if not (isinstance(node, ast.Constant) and isinstance(node.value, (str, bytes))):
+        return False
+    text = node.value if isinstance(node.value, str) else node.value.decode('latin-1')
+    return '/etc/' in text or any(path in text for path in RESTRICTED_PATHS)
+
+
+def _is_getattr_lookup(node) -> bool:
+    return (isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id == 'getattr'
+            and len(node.args) >= 2 and isinstance(node.args[1], ast.Constant)
+            and isinstance(node.args[1].value, str))
+
+
+def _py_dotted(node, aliases: Dict[str, str]) -> Optional[str]:
+    parts = []
+    while True:
+        if isinstance(node, ast.Attribute):
+            parts.append(node.attr)
+            node = node.value
+        elif _is_getattr_lookup(node):
+            parts.append(node.args[1].value)
+            node = node.args[0]
+        else:
+            break
+    if not isinstance(node, ast.Name):
+        return None
+    parts.append(aliases.get(node.id, node.id))
+    return '.'.join(reversed(parts))
+
+
+def _find_dangerous_python_ast(code: str) -> Optional[str]:
+    """First forbidden name referenced by code; raises SyntaxError if it does not parse."""
+    try:
+        tree = ast.parse(code)
+    except (ValueError, RecursionError) as e:
+        raise SyntaxError(str(e)) from e
+    nodes = list(ast.walk(tree))
+    aliases = {}
+    for node in nodes:
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                if alias.name.split('.', 1)[0] in PY_FORBIDDEN_MODULES:
+                    return alias.name
+                if alias.asname:
+                    aliases[alias.asname] = alias.name
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            for alias in node.names:
+                if alias.name == '*':
+                    if node.module.split('.', 1)[0] in PY_STAR_IMPORT_BLOCKED:
+                        return f"from {node.module} import *"
+                    continue
+                full = f"{node.module}.{alias.name}"
+                if _py_forbidden(full):
+                    return full
+                aliases[alias.asname or alias.name] = full
+    for node in nodes:
+        if isinstance(node, ast.Attribute) and node.attr in PY_FORBIDDEN_ATTRS:
+            return node.attr
+        if _is_getattr_lookup(node) and node.args[1].value in PY_FORBIDDEN_ATTRS:
+            return node.args[1].value
+        if (isinstance(node, (ast.Attribute, ast.Name)) and isinstance(node.ctx, ast.Load)) or _is_getattr_lookup(node):
+            name = _py_dotted(node, aliases)
+            if name and _py_forbidden(name):
+                return name
+        elif isinstance(node, ast.Call) and _strip_builtins(_py_dotted(node.func, aliases) or '') in PY_OPEN_NAMES:
+            path = node.args[0] if node.args else next(
+                (kw.value for kw in node.keywords if kw.arg == 'file'), None)
+            # Like the baseline pattern, only paths spelled out under /etc/ (or a restricted
+            # path) are refused; open(variable) is ordinary file I/O and stays allowed.
+            if path is not None and any(_py_restricted_literal(sub) for sub in ast.walk(path)):
+                return "open(/etc/...)"
+    return None
+
+
+COMPILED_MODULE_ERR = re.compile(r"No module named ['\"]([^'\"]+)['\"]")
+PIP_PACKAGE_FOR_MODULE = MappingProxyType({
+    'bs4': 'beautifulsoup4',
+    'cv2': 'opencv-python',
+    'PIL': 'Pillow',
+    'sklearn': 'scikit-learn',
+    'yaml': 'pyyaml',
+    'dotenv': 'python-dotenv',
+    'gi': 'PyGObject',
+})
+PARENT_TRAVERSAL = '../../../'
+
+MAX_OUTPUT_LENGTH = 50000
+
+# Bump when any pattern list changes so cached verdicts from older rules are not reused.
+PATTERNS_VERSION = 4
+VALIDATION_CACHE_SIZE = 2048
+_validation_cache: "OrderedDict[tuple, object]" = OrderedDict()
+_validation_cache_lock = threading.Lock()
+
+
+def _memoized(code: str, kind: tuple, compute):
+    # Retries and replayed tool calls resubmit identical snippets; key on a digest of the
+    # code so the cache does not pin large sources in memory.
+    digest = hashlib.blake2b(code.encode('utf-8', errors='surrogatepass'), digest_size=16).digest()
+    key = (digest, PATTERNS_VERSION) + kind
+    with _validation_cache_lock:
+        if key in _validation_cache:
+            _validation_cache.move_to_end(key)
+            return _validation_cache[key]
+    result = compute()
+    with _validation_cache_lock:
+        _validation_cache[key] = result
+        if len(_validation_cache) > VALIDATION_CACHE_SIZE:
+            _validation_cache.popitem(last=False)
+    return result
+
+
+# Forkserver for Python snippets: a warm interpreter that forks a fresh child per job,
+# so each snippet still runs in its own process without paying interpreter startup.
+_ZYGOTE_SRC = r"""
+import builtins, json, os, socket, sys, traceback, types
+sock = socket.socket(fileno=int(sys.argv[1]))
+while True:
+    try:
+        data, fds, _, _ = socket.recv_fds(sock, 65536, 2)
+    except OSError:
+        break
+    if not data:
+        break
+    while not data.endswith(b"\n"):
+        chunk = sock.recv(65536)
+        if not chunk:
+            sys.exit(0)
+        data += chunk
+    job = json.loads(data)
+    pid = os.fork()
+    if pid == 0:
+        sock.close()
+        os.setsid()
+        os.dup2(fds[0], 1)
+        os.dup2(fds[1], 2)
+        for fd in fds:
+            os.close(fd)
+        os.chdir(job["cwd"])
+        os.environ.clear()
+        os.environ.update(job["env"])
+        sys.dont_write_bytecode = bool(job["env"].get("PYTHONDONTWRITEBYTECODE"))
+        extra = [p for p in job["env"].get("PYTHONPATH", "").split(os.pathsep) if p]
+        sys.path[:0] = [""] + extra
+        sys.argv = ["-"]
+        main = types.ModuleType("__main__")
+        main.__file__ = "<stdin>"
+        main.__builtins__ = builtins
+        sys.modules["__main__"] = main
+        rc = 0
+        try:
+            exec(compile(job["code"], "<stdin>", "exec"), main.__dict__)
+        except SystemExit as e:
+            if isinstance(e.code, int):
+                rc = e.code
+            elif e.code is not None:
+                print(e.code, file=sys.stderr)
+                rc = 1
+        except BaseException as e:
+            traceback.print_exception(type(e), e, e.__traceback__.tb_next)
+            rc = 1
+        try:
+            sys.stdout.flush()
+            sys.stderr.flush()
+        finally:
+            os._exit(rc)
+    for fd in fds:
+        os.close(fd)
+    sock.sendall(json.dumps({"pid": pid}).encode() + b"\n")
+    _, status = os.waitpid(pid, 0)
+    sock.sendall(json.dumps({"rc": os.waitstatus_to_exitcode(status)}).encode() + b"\n")
+"""
+
+ZYGOTE_STATUS_TIMEOUT = 5.0
+KILL_DRAIN_GRACE = 1.0
+
+
+def _bounded_read(out_fd: int, err_fd: int, timeout: float, cap: int, kill) -> tuple:
+    """Read both pipes until EOF, the deadline, or cap bytes on either one.
+
+    Returns (stdout, stderr, timed_out, overflowed); kill() is called once when the
+    deadline passes or the cap is hit, so a chatty process never buffers more than cap.
+    """
+    deadline = time.monotonic() + timeout
+    buffers = {out_fd: bytearray(), err_fd: bytearray()}
+    timed_out = overflowed = killed = False
+    with selectors.DefaultSelector() as sel:
+        for fd in buffers:
+            sel.register(fd, selectors.EVENT_READ)
+        while sel.get_map():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                if killed:
+                    break
+                timed_out = True
+            if (timed_out or overflowed) and not killed:
+                killed = True
+                kill()
+                # Collect what the killed process already wrote, but do not wait
+                # on descendants that escaped the process group.
+                deadline = time.monotonic() + KILL_DRAIN_GRACE
+                continue
+            for key, _ in sel.select(remaining):
+                data = os.read(key.fd, 65536)
+                if not data:
+                    sel.unregister(key.fd)
+                    continue
+                buf = buffers[key.fd]
+                if len(buf) <= cap:
+                    buf += data[:cap + 1 - len(buf)]
+                    if len(buf) > cap:
+                        overflowed = True
+    return bytes(buffers[out_fd]), bytes(buffers[err_fd]), timed_out, overflowed
+
+
+class _PythonZygote:
+    def __init__(self, command: List[str], preexec):
+        self._sock, child_sock = socket.socketpair()
+        try:
+            self.process = subprocess.Popen(
+                command + ['-c', _ZYGOTE_SRC, str(child_sock.fileno())],
+                stdin=subprocess.DEVNULL,
+                pass_fds=(child_sock.fileno(),),
+                preexec_fn=preexec,
+            )
+        finally:
+            child_sock.close()
+        self._buffer = b''
+
+    def alive(self) -> bool:
+        return self.process.poll() is None
+
+    def close(self):
+        try:
+            self._sock.close()
+        finally:
+            if self.alive():
+                self.process.kill()
+                self.process.wait()
+
+    def _read_message(self, timeout: Optional[float]) -> dict:
+        self._sock.settimeout(timeout)
+        while b'\n' not in self._buffer:
+            chunk = self._sock.recv(4096)
+            if not chunk:
+                raise EOFError("python worker exited")
+            self._buffer += chunk
+        line, self._buffer = self._buffer.split(b'\n', 1)
+        return json.loads(line)
+
+    def run(self, code: str, cwd: str, env: Dict[str, str], timeout: float) -> tuple:
+        """Run code in a forked child; returns (stdout, stderr, rc, timed_out, overflowed)."""
+        out_r, out_w = os.pipe()
+        err_r, err_w = os.pipe()
+        try:
+            job = json.dumps({"code": code, "cwd": cwd, "env": env}).encode() + b'\n'
+            socket.send_fds(self._sock, [job], [out_w, err_w])
+        finally:
+            os.close(out_w)
+            os.close(err_w)
+        try:
+            pid = self._read_message(timeout)["pid"]
+
+            def kill():
+                try:
+                    os.killpg(pid, signal.SIGKILL)
+                except OSError:
+                    pass
+
+            stdout, stderr, timed_out, overflowed = _bounded_read(out_r, err_r, timeout, MAX_OUTPUT_LENGTH, kill)
+            rc = self._read_message(ZYGOTE_STATUS_TIMEOUT)["rc"]
+        finally:
+            os.close(out_r)
+            os.close(err_r)
+        return stdout, stderr, rc, timed_out, overflowed
+
 
 @dataclass
 class SandboxResult:
@@ -186,6 +659,43 @@ class SafeExecutor:
         self.block_network = block_network
         self.isolation_mode = isolation_mode
         self.logger = Logger("sandbox.log")
+        self._pythonlibs_cache: Optional[tuple] = None
+        # Children get a snapshot of the environment taken here; copying os.environ
+        # on every execution was measurable for short snippets.
+        self._base_env: Dict[str, str] = dict(os.environ)
+        self._shell_env: Dict[str, str] = {**self._base_env, 'PYTHONDONTWRITEBYTECODE': '1'}
+        self._python_env_cache: Optional[tuple] = None
+        self._zygote: Optional[_PythonZygote] = None
+        self._zygote_lock = threading.Lock()
+
+    def _resolve_pythonlibs(self) -> Optional[str]:
+        # Re-scanned only when the lib directory's mtime changes (a new interpreter
+        # version directory added or removed), not on every execution.
+        pythonlibs = os.path.join(os.path.expanduser('~'), 'workspace', '.pythonlibs', 'lib')
+        try:
+            mtime = os.stat(pythonlibs).st_mtime_ns
+        except OSError:
+            return None
+        if self._pythonlibs_cache is not None and self._pythonlibs_cache[0] == mtime:
+            return self._pythonlibs_cache[1]
+        found = None
+        for d in os.listdir(pythonlibs):
+            sp = os.path.join(pythonlibs, d, 'site-packages')
+            if os.path.isdir(sp):
+                found = sp
+                break
+        self._pythonlibs_cache = (mtime, found)
+        return found
+
+    def _python_env(self) -> Dict[str, str]:
+        sp = self._resolve_pythonlibs()
+        if self._python_env_cache is None or self._python_env_cache[0] != sp:
+            env = dict(self._shell_env)
+            if sp:
+                existing = env.get('PYTHONPATH', '')
+                env['PYTHONPATH'] = sp + (':' + existing if existing else '')
+            self._python_env_cache = (sp, env)
+        return self._python_env_cache[1]
 
     def _set_resource_limits(self):
         try:
@@ -194,54 +704,51 @@ class SafeExecutor:
         except (ValueError, OSError):
             pass
 
-    def _truncate_output(self, text: str) -> tuple:
+    def _kill_process(self, process: subprocess.Popen):
+        try:
+            if os.name != 'nt':
+                os.killpg(os.getpgid(process.pid), signal.SIGKILL)
+            else:
+                process.kill()
+        except OSError:
+            pass
+
+    def _truncate_output(self, text: str, overflowed: bool = False) -> tuple:
+        if overflowed:
+            return text[:MAX_OUTPUT_LENGTH] + f"\n\n... [output truncated at {MAX_OUTPUT_LENGTH} chars, process stopped]", True
         if len(text) > MAX_OUTPUT_LENGTH:
             truncated = text[:MAX_OUTPUT_LENGTH] + f"\n\n... [output truncated, {len(text) - MAX_OUTPUT_LENGTH} chars omitted]"
             return truncated, True
         return text, False
 
     def _check_path_safety(self, code: str) -> tuple:
-        for restricted in RESTRICTED_PATHS:
-            if restricted in code:
-                return False, f"Access to restricted path blocked: {restricted}"
+        restricted = _find_any(AC_RESTRICTED_PATHS, RESTRICTED_PATHS, code)
+        if restricted is not None:
+            return False, f"Access to restricted path blocked: {restricted}"
         if self.isolation_mode == "workspace":
-            parent_traversal = re.findall(r'\.\./\.\./\.\./', code)
-            if parent_traversal:
+            if PARENT_TRAVERSAL in code:
                 return False, "Path traversal beyond workspace detected"
         return True, ""
 
     def _is_server_code(self, code: str) -> bool:
         if not code:
             return False
-        server_indicators = [
-            r'from\s+flask\s+import',
-            r'from\s+fastapi\s+import',
-            r'import\s+flask',
-            r'import\s+fastapi',
-            r'app\s*=\s*Flask\s*\(',
-            r'app\s*=\s*FastAPI\s*\(',
-            r'app\.run\s*\(',
-            r'uvicorn\.run\s*\(',
-            r'@app\.route\s*\(',
-            r'@app\.(get|post|put|delete|patch)\s*\(',
-        ]
-        matches = sum(1 for p in server_indicators if re.search(p, code))
-        return matches >= 2
+        return _memoized(code, ('server',), lambda: sum(1 for p in COMPILED_SERVER_INDICATORS if p.search(code)) >= 2)
 
     def _strip_server_start(self, code: str, language: str) -> str:
         if language != 'python':
             return code
+        return _memoized(code, ('strip',), lambda: self._strip_python_server_start(code))
+
+    def _strip_python_server_start(self, code: str) -> str:
+        if _find_any(AC_SERVER_HINTS, SERVER_HINT_LITERALS, code) is None:
+            return code
         lines = code.split('\n')
         cleaned = []
         skip_block = False
         for line in lines:
             stripped = line.strip()
-            is_server_line = False
-            for pattern in SERVER_START_PATTERNS:
-                if re.search(pattern, stripped):
-                    is_server_line = True
-                    break
-            if is_server_line:
+            if COMBINED_SERVER_START.search(stripped):
                 cleaned.append(f"# [sandbox] server start removed: {stripped}")
                 continue
             if stripped.startswith('if __name__') and '__main__' in stripped:
@@ -258,20 +765,11 @@ class SafeExecutor:
         return '\n'.join(cleaned)
 
     def _try_auto_install(self, error_text: str) -> bool:
-        module_match = re.search(r"No module named ['\"]([^'\"]+)['\"]", error_text)
+        module_match = COMPILED_MODULE_ERR.search(error_text)
         if not module_match:
             return False
-        module_name = module_match.group(1).split('.')[0]
-        pkg_map = {
-            'bs4': 'beautifulsoup4',
-            'cv2': 'opencv-python',
-            'PIL': 'Pillow',
-            'sklearn': 'scikit-learn',
-            'yaml': 'pyyaml',
-            'dotenv': 'python-dotenv',
-            'gi': 'PyGObject',
-        }
-        pkg_name = pkg_map.get(module_name, module_name)
+        module_name = module_match.group(1).partition('.')[0]
+        pkg_name = PIP_PACKAGE_FOR_MODULE.get(module_name, module_name)
         self.logger.info(f"Auto-installing missing module: {pkg_name}")
         try:
             result = subprocess.run(
@@ -287,6 +785,10 @@ class SafeExecutor:
         return False
 
     def validate_code(self, code: str, language: str) -> tuple:
+        return _memoized(code, ('validate', language, self.block_network, self.isolation_mode),
+                         lambda: self._validate_code(code, language))
+
+    def _validate_code(self, code: str, language: str) -> tuple:
         path_safe, path_reason = self._check_path_safety(code)
         if not path_safe:
             return False, path_reason
@@ -295,19 +797,32 @@ class SafeExecutor:
         if not config:
             return True, ""
         
-        for pattern in config['patterns']:
-            match = re.search(pattern, code)
-            if match:
-                return False, f"Blocked dangerous pattern: {match.group()}"
+        blocked = self._find_dangerous(code, language)
+        if blocked is not None:
+            return False, f"Blocked dangerous pattern: {blocked}"
         
         if self.block_network and language == 'python':
-            network_patterns = [r'\bsocket\b', r'\burllib\b', r'\brequests\b', r'\bhttplib\b', r'\bhttp\b']
-            for pattern in network_patterns:
-                match = re.search(pattern, code)
-                if match:
-                    return False, f"Network access blocked: {match.group()}"
+            match = COMBINED_NETWORK.search(code)
+            if match:
+                return False, f"Network access blocked: {match.group()}"
         return True, ""
 
+    def _find_dangerous(self, code: str, language: str) -> Optional[str]:
+        if language == 'python':
+            try:
+                return _find_dangerous_python_ast(code)
+            except SyntaxError:
+                pass
+        literals = DANGEROUS_LITERALS[language]
+        if literals is not None:
+            if not literals or _find_any(AC_DANGEROUS_LITERALS[language], literals, code) is None:
+                return None
+        hs_db = HS_DANGEROUS[language]
+        if hs_db is not None:
+            return _hyperscan_first_match(hs_db, code)
+        match = COMBINED_DANGEROUS[language].search(code)
+        return match.group() if match else None
+
     def validate_python(self, code: str) -> tuple:
         return self.validate_code(code, 'python')
 
@@ -360,26 +875,19 @@ class SafeExecutor:
         return result
 
     def _run_code_subprocess(self, code: str, language: str, config: dict) -> SandboxResult:
-        with tempfile.NamedTemporaryFile(mode='w', suffix=config['extension'],
-                                          dir=self.work_dir, delete=False) as f:
-            f.write(code)
-            temp_path = f.name
+        use_stdin = config.get('stdin', False)
+        temp_path = None
+        if not use_stdin:
+            with tempfile.NamedTemporaryFile(mode='w', suffix=config['extension'],
+                                              dir=self.work_dir, delete=False) as f:
+                f.write(code)
+                temp_path = f.name
 
         try:
             start_time = time.time()
-            env = os.environ.copy()
-            if language == 'python':
-                env['PYTHONDONTWRITEBYTECODE'] = '1'
-                pythonlibs = os.path.join(os.path.expanduser('~'), 'workspace', '.pythonlibs', 'lib')
-                if os.path.isdir(pythonlibs):
-                    for d in os.listdir(pythonlibs):
-                        sp = os.path.join(pythonlibs, d, 'site-packages')
-                        if os.path.isdir(sp):
-                            existing = env.get('PYTHONPATH', '')
-                            env['PYTHONPATH'] = sp + (':' + existing if existing else '')
-                            break
-
-            cmd = config['command'] + [temp_path]
+            env = self._python_env() if language == 'python' else self._base_env
+
+            cmd = config['command'] + ['-' if use_stdin else temp_path]
             self.logger.info(f"Executing {language}: {cmd[0]} ...")
 
             def preexec():
@@ -387,38 +895,38 @@ class SafeExecutor:
                     os.setsid()
                     self._set_resource_limits()
 
+            if language == 'python':
+                result = self._run_in_zygote(code, env, config, preexec, start_time)
+                if result is not None:
+                    return result
+
             process = subprocess.Popen(
                 cmd,
+                stdin=subprocess.PIPE if use_stdin else subprocess.DEVNULL,
                 stdout=subprocess.PIPE,
                 stderr=subprocess.PIPE,
                 cwd=self.work_dir,
                 env=env,
                 preexec_fn=preexec if os.name != 'nt' else None
             )
-
-            try:
-                stdout, stderr = process.communicate(timeout=self.timeout)
-                execution_time = time.time() - start_time
-                output_text = stdout.decode('utf-8', errors='replace')
-                error_text = stderr.decode('utf-8', errors='replace')
-                output_text, truncated = self._truncate_output(output_text)
-                
-                self.logger.info(f"{language} execution completed in {execution_time:.2f}s (rc={process.returncode})")
-                return SandboxResult(
-                    success=(process.returncode == 0),
-                    output=output_text,
-                    errors=error_text,
-                    execution_time=execution_time,
-                    language=language,
-                    truncated=truncated
-                )
-            except subprocess.TimeoutExpired:
-                if os.name != 'nt':
-                    os.killpg(os.getpgid(process.pid), signal.SIGKILL)
-                else:
-                    process.kill()
-                stdout, stderr = process.communicate()
-                execution_time = time.time() - start_time
+            if use_stdin:
+                # Both interpreters read the whole script before running it, so this
+                # cannot deadlock against the output pipes.
+                try:
+                    process.stdin.write(code.encode('utf-8'))
+                except BrokenPipeError:
+                    pass
+                finally:
+                    process.stdin.close()
+
+            stdout, stderr, timed_out, overflowed = _bounded_read(
+                process.stdout.fileno(), process.stderr.fileno(),
+                self.timeout, MAX_OUTPUT_LENGTH, lambda: self._kill_process(process))
+            process.stdout.close()
+            process.stderr.close()
+            process.wait()
+            execution_time = time.time() - start_time
+            if timed_out:
                 self.logger.warning(f"{language} execution timed out after {self.timeout}s")
                 return SandboxResult(
                     success=False,
@@ -428,28 +936,72 @@ class SafeExecutor:
                     language=language,
                     timed_out=True
                 )
+            output_text, truncated = self._truncate_output(stdout.decode('utf-8', errors='replace'), overflowed)
+
+            self.logger.info(f"{language} execution completed in {execution_time:.2f}s (rc={process.returncode})")
+            return SandboxResult(
+                success=(process.returncode == 0),
+                output=output_text,
+                errors=stderr.decode('utf-8', errors='replace')[:MAX_OUTPUT_LENGTH],
+                execution_time=execution_time,
+                language=language,
+                truncated=truncated
+            )
         finally:
-            try:
-                os.unlink(temp_path)
-            except OSError:
-                pass
+            if temp_path:
+                try:
+                    os.unlink(temp_path)
+                except OSError:
+                    pass
+
+    def _run_in_zygote(self, code: str, env: Dict[str, str], config: dict,
+                       preexec, start_time: float) -> Optional[SandboxResult]:
+        """Run Python code through the forkserver; None means fall back to a fresh interpreter."""
+        if os.name == 'nt' or not hasattr(socket, 'send_fds'):
+            return None
+        if not self._zygote_lock.acquire(blocking=False):
+            return None
+        try:
+            if self._zygote is None or not self._zygote.alive():
+                self._zygote = _PythonZygote(config['command'], preexec)
+            stdout, stderr, rc, timed_out, overflowed = self._zygote.run(code, self.work_dir, env, self.timeout)
+        except Exception as e:
+            self.logger.warning(f"Python worker unavailable, using a fresh interpreter: {e}")
+            if self._zygote is not None:
+                self._zygote.close()
+                self._zygote = None
+            return None
+        finally:
+            self._zygote_lock.release()
+        execution_time = time.time() - start_time
+        if timed_out:
+            self.logger.warning(f"python execution timed out after {self.timeout}s")
+            return SandboxResult(
+                success=False,
+                output=stdout.decode('utf-8', errors='replace'),
+                errors=f"Execution timed out after {self.timeout} seconds",
+                execution_time=execution_time,
+                language='python',
+                timed_out=True
+            )
+        output_text, truncated = self._truncate_output(stdout.decode('utf-8', errors='replace'), overflowed)
+        self.logger.info(f"python execution completed in {execution_time:.2f}s (rc={rc})")
+        return SandboxResult(
+            success=(rc == 0),
+            output=output_text,
+            errors=stderr.decode('utf-8', errors='replace')[:MAX_OUTPUT_LENGTH],
+            execution_time=execution_time,
+            language='python',
+            truncated=truncated
+        )
 
     def _is_system_install(self, command: str) -> bool:
         cmd_lower = command.lower().strip()
-        system_patterns = [
-            "apt install", "apt-get install", "apt update", "apt-get update",
-            "brew install", "conda install",
-        ]
-        return any(pattern in cmd_lower for pattern in system_patterns)
+        return _find_any(AC_SYSTEM_INSTALL, SYSTEM_INSTALL_PATTERNS, cmd_lower) is not None
 
     def _is_allowed_install(self, command: str) -> bool:
         cmd_lower = command.lower().strip()
-        allowed_patterns = [
-            "pip install", "pip3 install",
-            "npm install", "npm i ", "yarn add", "yarn install",
-            "npx ", "npm init", "npm create",
-        ]
-        return any(pattern in cmd_lower for pattern in allowed_patterns)
+        return _find_any(AC_ALLOWED_INSTALL, ALLOWED_INSTALL_PATTERNS, cmd_lower) is not None
 
     def _add_pip_safety(self, command: str) -> str:
         return command
@@ -488,41 +1040,23 @@ class SafeExecutor:
                     os.setsid()
                     self._set_resource_limits()
 
-            env = os.environ.copy()
-            env['PYTHONDONTWRITEBYTECODE'] = '1'
-
             process = subprocess.Popen(
                 ['bash', '-c', command],
                 stdout=subprocess.PIPE,
                 stderr=subprocess.PIPE,
                 cwd=self.work_dir,
-                env=env,
+                env=self._shell_env,
                 preexec_fn=preexec if os.name != 'nt' else None
             )
 
-            try:
-                stdout, stderr = process.communicate(timeout=self.timeout)
-                execution_time = time.time() - start_time
-                output_text = stdout.decode('utf-8', errors='replace')
-                error_text = stderr.decode('utf-8', errors='replace')
-                output_text, truncated = self._truncate_output(output_text)
-
-                self.logger.info(f"Bash execution completed in {execution_time:.2f}s (rc={process.returncode})")
-                return SandboxResult(
-                    success=(process.returncode == 0),
-                    output=output_text,
-                    errors=error_text,
-                    execution_time=execution_time,
-                    language='bash',
-                    truncated=truncated
-                )
-            except subprocess.TimeoutExpired:
-                if os.name != 'nt':
-                    os.killpg(os.getpgid(process.pid), signal.SIGKILL)
-                else:
-                    process.kill()
-                stdout, stderr = process.communicate()
-                execution_time = time.time() - start_time
+            stdout, stderr, timed_out, overflowed = _bounded_read(
+                process.stdout.fileno(), process.stderr.fileno(),
+                self.timeout, MAX_OUTPUT_LENGTH, lambda: self._kill_process(process))
+            process.stdout.close()
+            process.stderr.close()
+            process.wait()
+            execution_time = time.time() - start_time
+            if timed_out:
                 self.logger.warning(f"Bash execution timed out after {self.timeout}s")
                 return SandboxResult(
                     success=False,
@@ -532,6 +1066,17 @@ class SafeExecutor:
                     language='bash',
                     timed_out=True
                 )
+            output_text, truncated = self._truncate_output(stdout.decode('utf-8', errors='replace'), overflowed)
+
+            self.logger.info(f"Bash execution completed in {execution_time:.2f}s (rc={process.returncode})")
+            return SandboxResult(
+                success=(process.returncode == 0),
+                output=output_text,
+                errors=stderr.decode('utf-8', errors='replace')[:MAX_OUTPUT_LENGTH],
+                execution_time=execution_time,
+                language='bash',
+                truncated=truncated
+            )
         except Exception as e:
             execution_time = time.time() - start_time
             self.logger.error(f"Bash execution error: {str(e)}")
@@ -554,12 +1099,26 @@ class SafeExecutor:
         return self._execute_code(code, 'go')
 
 
+HISTORY_PREVIEW_LENGTH = 512
+
+
+@dataclass(slots=True)
+class HistoryEntry:
+    language: str
+    success: bool
+    blocked: bool
+    timed_out: bool
+    execution_time: float
+    output_preview: str
+
+
 class Sandbox:
     def __init__(self, work_dir: Optional[str] = None,
                  timeout: int = 60,
                  max_memory_mb: int = 1024,
                  block_network: bool = False,
-                 isolation_mode: str = "workspace"):
+                 isolation_mode: str = "workspace",
+                 history_cap: int = 256):
         self.work_dir = work_dir or os.getcwd()
         self.timeout = timeout
         self.max_memory_mb = max_memory_mb
@@ -572,31 +1131,48 @@ class Sandbox:
             block_network=self.block_network,
             isolation_mode=self.isolation_mode,
         )
-        self.execution_history: List[tuple] = []
+        self.history_cap = history_cap
+        self.execution_history: "deque[HistoryEntry]" = deque(maxlen=history_cap)
+        self._stats = self._empty_stats()
         self.logger = Logger("sandbox.log")
 
+    @staticmethod
+    def _empty_stats() -> Dict:
+        return {'total': 0, 'success': 0, 'blocked': 0, 'timed_out': 0, 'total_time': 0.0}
+
+    def _record(self, language: str, result: SandboxResult):
+        stats = self._stats
+        stats['total'] += 1
+        stats['success'] += result.success
+        stats['blocked'] += result.blocked
+        stats['timed_out'] += result.timed_out
+        stats['total_time'] += result.execution_time
+        self.execution_history.append(HistoryEntry(
+            language, result.success, result.blocked, result.timed_out,
+            result.execution_time, result.output[:HISTORY_PREVIEW_LENGTH]))
+
     @property
     def supported_languages(self) -> List[str]:
         return list(LANGUAGE_CONFIG.keys())
 
     def run_python(self, code: str) -> SandboxResult:
         result = self.executor.execute_python(code)
-        self.execution_history.append(('python', result))
+        self._record('python', result)
         return result
 
     def run_bash(self, command: str) -> SandboxResult:
         result = self.executor.execute_bash(command)
-        self.execution_history.append(('bash', result))
+        self._record('bash', result)
         return result
 
     def run_javascript(self, code: str) -> SandboxResult:
         result = self.executor.execute_javascript(code)
-        self.execution_history.append(('javascript', result))
+        self._record('javascript', result)
         return result
 
     def run_go(self, code: str) -> SandboxResult:
         result = self.executor.execute_go(code)
-        self.execution_history.append(('go', result))
+        self._record('go', result)
         return result
 
     def run(self, code: str, language: str) -> SandboxResult:
@@ -620,26 +1196,23 @@ class Sandbox:
             execution_time=0.0, language=language
         )
 
-    def get_history(self) -> list:
-        return self.execution_history
+    def get_history(self) -> List[HistoryEntry]:
+        return list(self.execution_history)
 
     def get_stats(self) -> Dict:
-        total = len(self.execution_history)
-        success = sum(1 for _, r in self.execution_history if r.success)
-        blocked = sum(1 for _, r in self.execution_history if r.blocked)
-        timed_out = sum(1 for _, r in self.execution_history if r.timed_out)
-        total_time = sum(r.execution_time for _, r in self.execution_history)
+        stats = self._stats
         return {
-            "total_executions": total,
-            "successful": success,
-            "failed": total - success,
-            "blocked": blocked,
-            "timed_out": timed_out,
-            "total_execution_time": round(total_time, 2),
+            "total_executions": stats['total'],
+            "successful": stats['success'],
+            "failed": stats['total'] - stats['success'],
+            "blocked": stats['blocked'],
+            "timed_out": stats['timed_out'],
+            "total_execution_time": round(stats['total_time'], 2),
         }
 
     def clear_history(self):
         self.execution_history.clear()
+        self._stats = self._empty_stats()
 
     def format_result(self, result: SandboxResult) -> str:
         lang_info = f" ({result.language})" if result.language else ""
@@ -1,6 +1,7 @@
 
 import os, sys
 import re
+import shlex
 from io import StringIO
 import subprocess
 
@@ -10,6 +11,52 @@ if __name__ == "__main__": # if running as a script for individual testing
 from sources.tools.tools import Tools
 from sources.tools.safety import is_any_unsafe
 
+_ERROR_PATTERNS = (
+    r"Traceback \(most recent call last\)",
+    r"errno \d+",
+    r"segmentation fault",
+    r"core dumped",
+    r"permission denied",
+    r"command not found",
+    r"no such file or directory",
+    r"syntax error",
+    r"SyntaxError:",
+    r"ModuleNotFoundError:",
+    r"ImportError:",
+    r"FileNotFoundError:",
+    r"NameError:",
+    r"TypeError:",
+    r"ValueError:",
+    r"KeyError:",
+    r"IndexError:",
+    r"AttributeError:",
+    r"externally-managed-environment",
+)
+_COMBINED_ERR_RE = re.compile("|".join(_ERROR_PATTERNS), re.IGNORECASE)
+
+_LANG_INTERPRETERS = frozenset({
+    "python", "python3", "gcc", "g++", "mvn", "go", "java", "javac", "rustc", "clang", "clang++", "node",
+})
+
+_SYSTEM_INSTALL_PATTERNS = (
+    "apt install", "apt-get install", "apt update", "apt-get update",
+    "brew install", "conda install",
+)
+_ALLOWED_INSTALL_PATTERNS = (
+    "pip install", "pip3 install",
+    "npm install", "npm i ",
+    "yarn add", "yarn install",
+    "npx ",
+)
+# Case-insensitive so commands can be matched as given, without a lowered copy per check.
+_SYSTEM_INSTALL_RE = re.compile("|".join(map(re.escape, _SYSTEM_INSTALL_PATTERNS)), re.IGNORECASE)
+_ALLOWED_INSTALL_RE = re.compile("|".join(map(re.escape, _ALLOWED_INSTALL_PATTERNS)), re.IGNORECASE)
+
+def _decode_output(raw: bytes) -> str:
+    # One bulk decode with the same newline handling text mode applied; invalid
+    # UTF-8 from a command is replaced instead of failing the whole step.
+    return raw.decode('utf-8', errors='replace').replace('\r\n', '\n').replace('\r', '\n')
+
 class BashInterpreter(Tools):
     """
     This class is a tool to allow agent for bash code execution.
@@ -26,9 +73,14 @@ class BashInterpreter(Tools):
         If so, return True, otherwise return False.
         Code written by the AI will be executed automatically, so it should not use bash to run it.
         """
-        lang_interpreter = ["python", "python3", "gcc", "g++", "mvn", "go", "java", "javac", "rustc", "clang", "clang++", "node"]
-        for word in command.split():
-            if any(word.startswith(lang) for lang in lang_interpreter):
+        try:
+            tokens = shlex.split(command, posix=False)
+        except ValueError:
+            tokens = command.split()
+        for token in tokens:
+            name = os.path.basename(token)
+            # python3.11 and similar versioned binaries count as their interpreter
+            if name in _LANG_INTERPRETERS or name.rstrip("0123456789.") in _LANG_INTERPRETERS:
                 return True
         return False
 
@@ -37,32 +89,14 @@ class BashInterpreter(Tools):
         Detect if AI is trying to install packages via system-level package managers.
         These commands should be blocked as they can modify system configuration.
         """
-        dangerous_patterns = [
-            "apt install", "apt-get install", "apt update", "apt-get update",
-            "brew install", "conda install",
-        ]
-        cmd_lower = command.lower().strip()
-        for pattern in dangerous_patterns:
-            if pattern in cmd_lower:
-                return True
-        return False
+        return _SYSTEM_INSTALL_RE.search(command) is not None
     
     def is_allowed_install_command(self, command: str) -> bool:
         """
         Detect if AI is using allowed package managers (pip, npm, yarn, npx).
         These commands are safe and should be allowed to execute.
         """
-        allowed_patterns = [
-            "pip install", "pip3 install",
-            "npm install", "npm i ",
-            "yarn add", "yarn install",
-            "npx ",
-        ]
-        cmd_lower = command.lower().strip()
-        for pattern in allowed_patterns:
-            if pattern in cmd_lower:
-                return True
-        return False
+        return _ALLOWED_INSTALL_RE.search(command) is not None
     
     def add_pip_safety_flag(self, command: str) -> str:
         """
@@ -78,6 +112,10 @@ class BashInterpreter(Tools):
         if safety and input("Execute command? y/n ") != "y":
             return "Command rejected by user."
     
+        if self.safe_mode and is_any_unsafe(commands):
+            print(f"Unsafe command rejected: {commands}")
+            return f"\nUnsafe command: {commands}. Execution aborted. This is beyond allowed capabilities report to user."
+
         concat_output = ""
         if self.work_dir and not os.path.exists(self.work_dir):
             os.makedirs(self.work_dir, exist_ok=True)
@@ -94,9 +132,6 @@ class BashInterpreter(Tools):
                 raw_command = self.add_pip_safety_flag(raw_command)
             
             command = f"cd {self.work_dir} && {raw_command}"
-            if self.safe_mode and is_any_unsafe(commands):
-                print(f"Unsafe command rejected: {command}")
-                return "\nUnsafe command: {command}. Execution aborted. This is beyond allowed capabilities report to user."
             if self.language_bash_attempt(command) and self.allow_language_exec_bash == False:
                 continue
             try:
@@ -105,18 +140,17 @@ class BashInterpreter(Tools):
                     shell=True,
                     stdout=subprocess.PIPE,
                     stderr=subprocess.STDOUT,
-                    universal_newlines=True
                 )
-                command_output = ""
-                for line in process.stdout:
-                    command_output += line
-                return_code = process.wait(timeout=timeout)
-                if return_code != 0:
-                    return f"Command {command} failed with return code {return_code}:\n{command_output}"
+                try:
+                    raw_output, _ = process.communicate(timeout=timeout)
+                except subprocess.TimeoutExpired:
+                    process.kill()  # Kill the process if it times out
+                    raw_output, _ = process.communicate()
+                    return f"Command {command} timed out. Output:\n{_decode_output(raw_output)}"
+                command_output = _decode_output(raw_output)
+                if process.returncode != 0:
+                    return f"Command {command} failed with return code {process.returncode}:\n{command_output}"
                 concat_output += f"Output of {command}:\n{command_output.strip()}\n"
-            except subprocess.TimeoutExpired:
-                process.kill()  # Kill the process if it times out
-                return f"Command {command} timed out. Output:\n{command_output}"
             except Exception as e:
                 return f"Command {command} failed:\n{str(e)}"
         return concat_output
@@ -137,31 +171,7 @@ class BashInterpreter(Tools):
         """
         if "failed with return code" in feedback:
             return True
-        error_patterns = [
-            r"Traceback \(most recent call last\)",
-            r"errno \d+",
-            r"segmentation fault",
-            r"core dumped",
-            r"permission denied",
-            r"command not found",
-            r"no such file or directory",
-            r"syntax error",
-            r"SyntaxError:",
-            r"ModuleNotFoundError:",
-            r"ImportError:",
-            r"FileNotFoundError:",
-            r"NameError:",
-            r"TypeError:",
-            r"ValueError:",
-            r"KeyError:",
-            r"IndexError:",
-            r"AttributeError:",
-            r"externally-managed-environment",
-        ]
-        combined_pattern = "|".join(error_patterns)
-        if re.search(combined_pattern, feedback, re.IGNORECASE):
-            return True
-        return False
+        return bool(_COMBINED_ERR_RE.search(feedback))
 
 if __name__ == "__main__":
     bash = BashInterpreter()
@@ -1,8 +1,11 @@
 import os
 import json
+import re
 import subprocess
+from functools import lru_cache
 from typing import Optional, Dict, List
 from sources.logger import Logger
+from sources.utility import iter_files
 
 
 PROJECT_TEMPLATES = {
@@ -213,6 +216,40 @@ PROJECT_TEMPLATES = {
     },
 }
 
+# Templates never change at runtime, so encode them once instead of on every scaffold.
+_TEMPLATE_BYTES = {
+    key: {fp: content.encode('utf-8') for fp, content in template["structure"].items()}
+    for key, template in PROJECT_TEMPLATES.items()
+}
+
+# Ordered by priority for detect_project_type.
+_TYPE_RULES = (
+    ("fullstack_python", ('fullstack', 'full-stack', 'full stack', 'database', 'crud', 'api + frontend')),
+    ("python_flask", ('flask', 'python web', 'python website')),
+    ("python_fastapi", ('fastapi', 'rest api', 'backend api')),
+    ("node_express", ('express', 'node.js', 'nodejs', 'node web')),
+    ("html_static", ('html', 'website', 'landing', 'portfolio', 'statis', 'static')),
+    ("python_script", ('python', 'script', 'program', 'automation')),
+)
+_TYPE_PRIORITY = tuple(key for key, _ in _TYPE_RULES)
+_TYPE_RE = re.compile("(?=" + "|".join(
+    f"(?P<{key}>{'|'.join(map(re.escape, keywords))})" for key, keywords in _TYPE_RULES
+) + ")")
+
+
+@lru_cache(maxsize=256)
+def _detect_project_type(desc: str) -> str:
+    # A keyword anywhere in the description beats any lower-priority keyword, so
+    # collect every rule that matches (overlaps included) and take the first.
+    matched = {m.lastgroup for m in _TYPE_RE.finditer(desc)}
+    for key in _TYPE_PRIORITY:
+        if key in matched:
+            return key
+    return "html_static"
+
+
+_SKIPPED_DIRS = frozenset({'__pycache__', 'node_modules', '.git'})
+
 
 class ProjectScaffolder:
     def __init__(self, base_dir: str = "/home/runner/workspace/work"):
@@ -221,20 +258,7 @@ class ProjectScaffolder:
         os.makedirs(base_dir, exist_ok=True)
 
     def detect_project_type(self, description: str) -> str:
-        desc = description.lower()
-        if any(kw in desc for kw in ['fullstack', 'full-stack', 'full stack', 'database', 'crud', 'api + frontend']):
-            return "fullstack_python"
-        if any(kw in desc for kw in ['flask', 'python web', 'python website']):
-            return "python_flask"
-        if any(kw in desc for kw in ['fastapi', 'rest api', 'backend api']):
-            return "python_fastapi"
-        if any(kw in desc for kw in ['express', 'node.js', 'nodejs', 'node web']):
-            return "node_express"
-        if any(kw in desc for kw in ['html', 'website', 'landing', 'portfolio', 'statis', 'static']):
-            return "html_static"
-        if any(kw in desc for kw in ['python', 'script', 'program', 'automation']):
-            return "python_script"
-        return "html_static"
+        return _detect_project_type(description.lower())
 
     def scaffold(self, project_name: str, template_key: str = None, description: str = "") -> Dict:
         if not template_key:
@@ -248,11 +272,15 @@ class ProjectScaffolder:
         project_path = os.path.join(self.base_dir, safe_name)
         os.makedirs(project_path, exist_ok=True)
 
+        structure = _TEMPLATE_BYTES[template_key]
+        # Files share a handful of directories; create each one once up front.
+        for directory in sorted({os.path.dirname(os.path.join(project_path, fp)) for fp in structure} - {project_path}):
+            os.makedirs(directory, exist_ok=True)
+
         created_files = []
-        for filepath, content in template["structure"].items():
+        for filepath, content in structure.items():
             full_path = os.path.join(project_path, filepath)
-            os.makedirs(os.path.dirname(full_path), exist_ok=True)
-            with open(full_path, 'w') as f:
+            with open(full_path, 'wb') as f:
                 f.write(content)
             created_files.append(filepath)
 
@@ -275,25 +303,44 @@ class ProjectScaffolder:
         }
 
     def _install_python_deps(self, deps: List[str]):
+        if self._pip_install(deps, timeout=60 * len(deps)) is None:
+            for dep in deps:
+                self.logger.info(f"Installed Python dep: {dep}")
+            return
+        # One bad requirement fails the whole batch; retry singly so the rest still install.
         for dep in deps:
-            try:
-                subprocess.run(
-                    ['pip', 'install', '--break-system-packages', '--quiet', dep],
-                    capture_output=True, text=True, timeout=60
-                )
+            error = self._pip_install([dep], timeout=60)
+            if error is None:
                 self.logger.info(f"Installed Python dep: {dep}")
-            except Exception as e:
-                self.logger.warning(f"Failed to install {dep}: {e}")
+            else:
+                self.logger.warning(f"Failed to install {dep}: {error}")
+
+    def _pip_install(self, deps: List[str], timeout: int) -> Optional[str]:
+        """Run one pip install; return None on success or the error text."""
+        try:
+            result = subprocess.run(
+                ['pip', 'install', '--break-system-packages', '--quiet', *deps],
+                stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, timeout=timeout
+            )
+        except Exception as e:
+            return str(e)
+        if result.returncode != 0:
+            return result.stderr.strip() or f"pip exited with {result.returncode}"
+        return None
 
     def _run_post_init(self, project_path: str, command: str):
         try:
-            subprocess.run(
+            result = subprocess.run(
                 command, shell=True, cwd=project_path,
-                capture_output=True, text=True, timeout=120
+                stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, timeout=120
             )
-            self.logger.info(f"Post-init command completed: {command}")
         except Exception as e:
             self.logger.warning(f"Post-init error: {e}")
+            return
+        if result.returncode != 0:
+            self.logger.warning(f"Post-init command failed ({result.returncode}): {command}\n{result.stderr.strip()}")
+            return
+        self.logger.info(f"Post-init command completed: {command}")
 
     def list_templates(self) -> List[Dict]:
         return [
@@ -305,12 +352,7 @@ class ProjectScaffolder:
         if not os.path.isdir(project_path):
             return {"exists": False}
 
-        files = []
-        for root, dirs, fnames in os.walk(project_path):
-            dirs[:] = [d for d in dirs if d not in ('__pycache__', 'node_modules', '.git')]
-            for fname in fnames:
-                rel = os.path.relpath(os.path.join(root, fname), project_path)
-                files.append(rel)
+        files = [rel_path for rel_path, _ in iter_files(project_path, _SKIPPED_DIRS)]
 
         project_type = "unknown"
         if any(f.endswith('.py') for f in files):
@@ -1,8 +1,12 @@
 import requests
+from requests.adapters import HTTPAdapter
 from bs4 import BeautifulSoup
 import os
 import json
 import re
+import importlib.util
+from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
 
 if __name__ == "__main__":
     import sys
@@ -10,7 +14,24 @@ if __name__ == "__main__":
 
 from sources.tools.tools import Tools
 
+# libxml2-backed parsing is several times faster than the pure-Python html.parser.
+HTML_PARSER = "lxml" if importlib.util.find_spec("lxml") else "html.parser"
+
 class searxSearch(Tools):
+    SEARXNG_HEADERS = {
+        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7',
+        'Accept-Language': 'en-US,en;q=0.9',
+        'Cache-Control': 'no-cache',
+        'Connection': 'keep-alive',
+        'Content-Type': 'application/x-www-form-urlencoded',
+        'Pragma': 'no-cache',
+        'Upgrade-Insecure-Requests': '1',
+    }
+    DUCKDUCKGO_HEADERS = {
+        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+        'Accept-Language': 'en-US,en;q=0.9',
+    }
+
     def __init__(self, base_url: str = None):
         """
         A tool for web search. Uses SearxNG if available, otherwise falls back to DuckDuckGo.
@@ -24,40 +45,48 @@ class searxSearch(Tools):
         self.paywall_keywords = [
             "Member-only", "access denied", "restricted content", "404", "this page is not working"
         ]
+        # Paywall banners sit near the top of the page, so only the start of the body is scanned.
+        self._paywall_re = re.compile("|".join(map(re.escape, self.paywall_keywords)), re.IGNORECASE)
+        self.paywall_scan_bytes = 65536
         self.use_searxng = bool(self.base_url)
+        self.link_check_workers = 16
+        self._session = requests.Session()
+        self._session.headers.update({"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"})
+        adapter = HTTPAdapter(pool_connections=16, pool_maxsize=32, max_retries=1)
+        self._session.mount('http://', adapter)
+        self._session.mount('https://', adapter)
+        self._searxng_headers = {**self.SEARXNG_HEADERS, 'User-Agent': self.user_agent}
+        self._duckduckgo_headers = {**self.DUCKDUCKGO_HEADERS, 'User-Agent': self.user_agent}
 
     def link_valid(self, link):
         """check if a link is valid."""
         # TODO find a better way
         if not link.startswith("http"):
             return "Status: Invalid URL"
-        
-        headers = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"}
         try:
-            response = requests.get(link, headers=headers, timeout=5)
-            status = response.status_code
-            if status == 200:
-                content = response.text.lower()
-                if any(keyword in content for keyword in self.paywall_keywords):
-                    return "Status: Possible Paywall"
-                return "Status: OK"
-            elif status == 404:
-                return "Status: 404 Not Found"
-            elif status == 403:
-                return "Status: 403 Forbidden"
-            else:
-                return f"Status: {status} {response.reason}"
+            with self._session.get(link, timeout=5, stream=True) as response:
+                status = response.status_code
+                if status == 200:
+                    head = response.raw.read(self.paywall_scan_bytes, decode_content=True)
+                    if self._paywall_re.search(head.decode("utf-8", errors="replace")):
+                        return "Status: Possible Paywall"
+                    return "Status: OK"
+                elif status == 404:
+                    return "Status: 404 Not Found"
+                elif status == 403:
+                    return "Status: 403 Forbidden"
+                else:
+                    return f"Status: {status} {response.reason}"
         except requests.exceptions.RequestException as e:
             return f"Error: {str(e)}"
 
     def check_all_links(self, links):
-        """Check all links, one by one."""
-        # TODO Make it asyncromous or smth
-        statuses = []
-        for i, link in enumerate(links):
-            status = self.link_valid(link)
-            statuses.append(status)
-        return statuses
+        """Check all links concurrently, statuses are returned in input order."""
+        links = list(links)
+        if not links:
+            return []
+        with ThreadPoolExecutor(max_workers=min(self.link_check_workers, len(links))) as executor:
+            return list(executor.map(self.link_valid, links))
     
     def execute(self, blocks: list, safety: bool = False) -> str:
         """Executes a search query and extracts URLs and titles."""
@@ -72,32 +101,38 @@ class searxSearch(Tools):
             return self._searxng_search(query)
         return self._duckduckgo_search(query)
 
+    @staticmethod
+    def _declared_encoding(response) -> Optional[str]:
+        """Charset from the Content-Type header, if any.
+
+        The raw bytes go straight to the parser; without a header charset it reads the
+        page's meta tag instead of requests guessing over the whole body for .text.
+        """
+        if 'charset' in response.headers.get('Content-Type', '').lower():
+            return response.encoding
+        return None
+
     def _searxng_search(self, query: str) -> str:
         """Search using SearxNG instance."""
         search_url = f"{self.base_url}/search"
-        headers = {
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7',
-            'Accept-Language': 'en-US,en;q=0.9',
-            'Cache-Control': 'no-cache',
-            'Connection': 'keep-alive',
-            'Content-Type': 'application/x-www-form-urlencoded',
-            'Pragma': 'no-cache',
-            'Upgrade-Insecure-Requests': '1',
-            'User-Agent': self.user_agent
-        }
         data = f"q={query}&categories=general&language=auto&time_range=&safesearch=0&theme=simple".encode('utf-8')
         try:
-            response = requests.post(search_url, headers=headers, data=data, verify=False)
+            response = self._session.post(search_url, headers=self._searxng_headers, data=data, verify=False)
             response.raise_for_status()
-            html_content = response.text
-            soup = BeautifulSoup(html_content, 'html.parser')
+            html_content = response.content
+            # Every result carries a url_header link; captcha and rate-limit pages do not.
+            if b'url_header' not in html_content:
+                return "No search results, web search failed."
+            soup = BeautifulSoup(html_content, HTML_PARSER, from_encoding=self._declared_encoding(response))
             results = []
             for article in soup.find_all('article', class_='result'):
                 url_header = article.find('a', class_='url_header')
                 if url_header:
                     url = url_header['href']
-                    title = article.find('h3').text.strip() if article.find('h3') else "No Title"
-                    description = article.find('p', class_='content').text.strip() if article.find('p', class_='content') else "No Description"
+                    title_tag = article.find('h3')
+                    content_tag = article.find('p', class_='content')
+                    title = title_tag.text.strip() if title_tag else "No Title"
+                    description = content_tag.text.strip() if content_tag else "No Description"
                     results.append(f"Title:{title}\nSnippet:{description}\nLink:{url}")
             if len(results) == 0:
                 return "No search results, web search failed."
@@ -108,16 +143,14 @@ class searxSearch(Tools):
     def _duckduckgo_search(self, query: str) -> str:
         """Fallback search using DuckDuckGo HTML."""
         search_url = "https://html.duckduckgo.com/html/"
-        headers = {
-            'User-Agent': self.user_agent,
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.9',
-        }
         data = {'q': query, 'b': ''}
         try:
-            response = requests.post(search_url, headers=headers, data=data, timeout=15)
+            response = self._session.post(search_url, headers=self._duckduckgo_headers, data=data, timeout=15)
             response.raise_for_status()
-            soup = BeautifulSoup(response.text, 'html.parser')
+            html_content = response.content
+            if b'result__a' not in html_content:
+                return "No search results, web search failed."
+            soup = BeautifulSoup(html_content, HTML_PARSER, from_encoding=self._declared_encoding(response))
             results = []
             for result_div in soup.find_all('div', class_='result'):
                 title_tag = result_div.find('a', class_='result__a')
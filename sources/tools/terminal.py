@@ -3,12 +3,125 @@ import threading
 import time
 import os
 import signal
-import re
+import select
+import selectors
+from collections import deque
 from typing import Optional, Dict, List
 from sources.logger import Logger
 
 
+_PIP_INSTALL_PREFIXES = ('pip install', 'pip3 install')
+
+OUTPUT_LINES_KEPT = 100
+KILL_DRAIN_GRACE = 1.0
+
+
+def _read_tails(process: subprocess.Popen, timeout: float, keep: int, kill) -> tuple:
+    """Read stdout and stderr until EOF or the deadline, keeping only the last keep bytes of each.
+
+    Returns (stdout, stderr, timed_out); kill() is called once when the deadline passes.
+    """
+    deadline = time.monotonic() + timeout
+    out_fd, err_fd = process.stdout.fileno(), process.stderr.fileno()
+    buffers = {out_fd: bytearray(), err_fd: bytearray()}
+    timed_out = False
+    with selectors.DefaultSelector() as sel:
+        for fd in buffers:
+            sel.register(fd, selectors.EVENT_READ)
+        while sel.get_map():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                if timed_out:
+                    break
+                timed_out = True
+                kill()
+                deadline = time.monotonic() + KILL_DRAIN_GRACE
+                continue
+            for key, _ in sel.select(remaining):
+                data = os.read(key.fd, 65536)
+                if not data:
+                    sel.unregister(key.fd)
+                    continue
+                buf = buffers[key.fd]
+                buf += data
+                if len(buf) > 2 * keep:
+                    del buf[:-keep]
+    return bytes(buffers[out_fd][-keep:]), bytes(buffers[err_fd][-keep:]), timed_out
+
+
+class _OutputPump:
+    """One selector thread draining the stdout pipes of all background processes."""
+
+    def __init__(self):
+        self._selector = selectors.DefaultSelector()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+
+    def register(self, pipe, lines: deque) -> threading.Event:
+        """Start draining pipe into lines; the returned event is set once it hits EOF."""
+        fd = pipe.fileno()
+        os.set_blocking(fd, False)
+        done = threading.Event()
+        with self._lock:
+            self._selector.register(fd, selectors.EVENT_READ, [lines, b'', done])
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+        self._wakeup.set()
+        return done
+
+    def unregister(self, pipe):
+        with self._lock:
+            try:
+                self._selector.unregister(pipe.fileno())
+            except (KeyError, ValueError, OSError):
+                pass
+
+    def _run(self):
+        while True:
+            with self._lock:
+                idle = not self._selector.get_map()
+                if idle:
+                    self._wakeup.clear()
+            if idle:
+                # Sleep until register() hands us a pipe instead of polling an empty selector.
+                self._wakeup.wait()
+                continue
+            try:
+                events = self._selector.select(0.1)
+            except OSError:
+                time.sleep(0.1)
+                continue
+            for key, _ in events:
+                with self._lock:
+                    # Skip events for pipes unregistered (or whose fd was reused) since select().
+                    if self._selector.get_map().get(key.fd) is not key:
+                        continue
+                    self._drain(key)
+
+    def _drain(self, key):
+        try:
+            chunk = os.read(key.fd, 4096)
+        except BlockingIOError:
+            return
+        except OSError:
+            chunk = b''
+        lines, pending, done = key.data
+        if not chunk:
+            if pending:
+                lines.append(pending.decode('utf-8', errors='replace').strip())
+                key.data[1] = b''
+            self._selector.unregister(key.fd)
+            done.set()
+            return
+        *complete, key.data[1] = (pending + chunk).split(b'\n')
+        lines.extend(line.decode('utf-8', errors='replace').strip() for line in complete)
+
+
 class PersistentTerminal:
+    _pump = _OutputPump()
+
     def __init__(self, work_dir: str = None):
         self.work_dir = work_dir or os.getcwd()
         self.logger = Logger("terminal.log")
@@ -19,19 +132,9 @@ class PersistentTerminal:
     def run_command(self, command: str, timeout: int = 30) -> dict:
         self.logger.info(f"Running command: {command}")
 
-        install_patterns = [
-            r'^pip\s+install',
-            r'^pip3\s+install',
-            r'^npm\s+install',
-            r'^yarn\s+add',
-            r'^apt-get\s+install',
-            r'^apt\s+install',
-        ]
-        is_install = any(re.match(p, command.strip()) for p in install_patterns)
-
-        if is_install:
-            if command.strip().startswith(('pip install', 'pip3 install')):
-                command = command.strip().replace(' --break-system-packages', '')
+        stripped = command.strip()
+        if stripped.startswith(_PIP_INSTALL_PREFIXES):
+            command = stripped.replace(' --break-system-packages', '')
 
         env = os.environ.copy()
         env['PYTHONDONTWRITEBYTECODE'] = '1'
@@ -47,37 +150,44 @@ class PersistentTerminal:
                 preexec_fn=os.setsid if os.name != 'nt' else None
             )
 
-            try:
-                stdout, stderr = process.communicate(timeout=timeout)
-                stdout_text = stdout.decode('utf-8', errors='replace')[-self.output_buffer_size:]
-                stderr_text = stderr.decode('utf-8', errors='replace')[-self.output_buffer_size:]
-
-                result = {
-                    'success': process.returncode == 0,
-                    'stdout': stdout_text,
-                    'stderr': stderr_text,
-                    'returncode': process.returncode,
-                    'command': command,
-                    'timed_out': False
-                }
-                self.logger.info(f"Command completed: rc={process.returncode}")
-                return result
-
-            except subprocess.TimeoutExpired:
-                if os.name != 'nt':
-                    os.killpg(os.getpgid(process.pid), signal.SIGKILL)
-                else:
+            if os.name != 'nt':
+                stdout, stderr, timed_out = _read_tails(
+                    process, timeout, self.output_buffer_size * 4,
+                    kill=lambda: self._kill_group(process))
+                process.stdout.close()
+                process.stderr.close()
+                process.wait()
+            else:
+                try:
+                    stdout, stderr = process.communicate(timeout=timeout)
+                    timed_out = False
+                except subprocess.TimeoutExpired:
                     process.kill()
-                stdout, stderr = process.communicate()
+                    stdout, stderr = process.communicate()
+                    timed_out = True
+
+            stdout_text = stdout.decode('utf-8', errors='replace')[-self.output_buffer_size:]
+            if timed_out:
                 return {
                     'success': False,
-                    'stdout': stdout.decode('utf-8', errors='replace')[-self.output_buffer_size:],
+                    'stdout': stdout_text,
                     'stderr': f"Command timed out after {timeout}s",
                     'returncode': -1,
                     'command': command,
                     'timed_out': True
                 }
 
+            result = {
+                'success': process.returncode == 0,
+                'stdout': stdout_text,
+                'stderr': stderr.decode('utf-8', errors='replace')[-self.output_buffer_size:],
+                'returncode': process.returncode,
+                'command': command,
+                'timed_out': False
+            }
+            self.logger.info(f"Command completed: rc={process.returncode}")
+            return result
+
         except Exception as e:
             self.logger.error(f"Command error: {str(e)}")
             return {
@@ -89,6 +199,13 @@ class PersistentTerminal:
                 'timed_out': False
             }
 
+    @staticmethod
+    def _kill_group(process: subprocess.Popen):
+        try:
+            os.killpg(os.getpgid(process.pid), signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+
     def start_background_process(self, name: str, command: str) -> dict:
         if name in self.processes and self.processes[name].get('process'):
             proc = self.processes[name]['process']
@@ -98,6 +215,7 @@ class PersistentTerminal:
                     'message': f'Process {name} already running (PID: {proc.pid})',
                     'pid': proc.pid
                 }
+            self._forget(name)
 
         if len(self.processes) >= self.max_processes:
             self._cleanup_dead_processes()
@@ -120,23 +238,38 @@ class PersistentTerminal:
                 'process': process,
                 'command': command,
                 'started': time.time(),
-                'output_lines': []
+                'output_lines': deque(maxlen=OUTPUT_LINES_KEPT),
+                'pidfd': self._open_pidfd(process.pid)
             }
 
-            output_thread = threading.Thread(
-                target=self._capture_output,
-                args=(name, process),
-                daemon=True
-            )
-            output_thread.start()
+            stdout_done = None
+            if os.name != 'nt':
+                stdout_done = self._pump.register(process.stdout, self.processes[name]['output_lines'])
+            else:
+                output_thread = threading.Thread(
+                    target=self._capture_output,
+                    args=(name, process),
+                    daemon=True
+                )
+                output_thread.start()
 
             time.sleep(1)
             if process.poll() is not None:
-                stdout, stderr = process.communicate()
+                if stdout_done is not None:
+                    # The pump owns stdout; let it reach EOF rather than racing it for the pipe.
+                    stdout_done.wait(KILL_DRAIN_GRACE)
+                    self._pump.unregister(process.stdout)
+                    process.stdout.close()
+                    stdout = '\n'.join(self.processes[name]['output_lines'])
+                    _, stderr = process.communicate()
+                else:
+                    stdout, stderr = process.communicate()
+                    stdout = stdout.decode('utf-8', errors='replace')
+                self._forget(name)
                 return {
                     'success': False,
                     'message': f'Process exited immediately',
-                    'stdout': stdout.decode('utf-8', errors='replace'),
+                    'stdout': stdout,
                     'stderr': stderr.decode('utf-8', errors='replace'),
                     'pid': process.pid
                 }
@@ -161,10 +294,7 @@ class PersistentTerminal:
                 if line:
                     decoded = line.decode('utf-8', errors='replace').strip()
                     if name in self.processes:
-                        lines = self.processes[name]['output_lines']
-                        lines.append(decoded)
-                        if len(lines) > 100:
-                            self.processes[name]['output_lines'] = lines[-50:]
+                        self.processes[name]['output_lines'].append(decoded)
         except Exception:
             pass
 
@@ -175,7 +305,7 @@ class PersistentTerminal:
         proc_info = self.processes[name]
         process = proc_info['process']
         is_running = process.poll() is None
-        lines = proc_info.get('output_lines', [])
+        lines = list(proc_info.get('output_lines', ()))
 
         return {
             'success': True,
@@ -191,7 +321,7 @@ class PersistentTerminal:
 
         process = self.processes[name]['process']
         if process.poll() is not None:
-            del self.processes[name]
+            self._forget(name)
             return {'success': True, 'message': f'Process {name} already stopped'}
 
         try:
@@ -208,7 +338,7 @@ class PersistentTerminal:
         except Exception as e:
             self.logger.warning(f"Error stopping {name}: {e}")
 
-        del self.processes[name]
+        self._forget(name)
         return {'success': True, 'message': f'Process {name} stopped'}
 
     def stop_all(self):
@@ -216,14 +346,50 @@ class PersistentTerminal:
         for name in names:
             self.stop_process(name)
 
+    @staticmethod
+    def _open_pidfd(pid: int) -> Optional[int]:
+        try:
+            return os.pidfd_open(pid)
+        except (AttributeError, OSError):
+            return None
+
+    def _forget(self, name: str):
+        info = self.processes.pop(name)
+        process = info['process']
+        self._pump.unregister(process.stdout)
+        for pipe in (process.stdout, process.stderr):
+            if pipe is not None:
+                pipe.close()
+        if info.get('pidfd') is not None:
+            os.close(info['pidfd'])
+
+    def _exited_names(self) -> set:
+        """Names of processes that have exited, using one poll() over their pidfds."""
+        exited = set()
+        by_fd = {}
+        for name, info in self.processes.items():
+            if info.get('pidfd') is None:
+                if info['process'].poll() is not None:
+                    exited.add(name)
+            else:
+                by_fd[info['pidfd']] = name
+        if by_fd:
+            poller = select.poll()
+            for fd in by_fd:
+                poller.register(fd, select.POLLIN)
+            for fd, _ in poller.poll(0):
+                name = by_fd[fd]
+                self.processes[name]['process'].poll()
+                exited.add(name)
+        return exited
+
     def _cleanup_dead_processes(self):
-        dead = [name for name, info in self.processes.items()
-                if info['process'].poll() is not None]
-        for name in dead:
-            del self.processes[name]
+        for name in self._exited_names():
+            self._forget(name)
 
     def list_processes(self) -> List[dict]:
         self._cleanup_dead_processes()
+        exited = self._exited_names()
         result = []
         for name, info in self.processes.items():
             proc = info['process']
@@ -231,7 +397,7 @@ class PersistentTerminal:
                 'name': name,
                 'command': info['command'],
                 'pid': proc.pid,
-                'running': proc.poll() is None,
+                'running': name not in exited,
                 'uptime': time.time() - info['started']
             })
         return result
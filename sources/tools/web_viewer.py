@@ -1,8 +1,22 @@
 import os
+import re
 import time
-import subprocess
+import requests
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional, Tuple
 from sources.logger import Logger
+from sources.utility import iter_files
+
+
+# All markers verify_html_file looks for, found in one case-insensitive pass.
+_HTML_MARKERS_RE = re.compile(r'<html|<!doctype|<head|<body|<style|stylesheet|<script', re.IGNORECASE)
+_HTML_MARKER_COUNT = 7
+_SKIPPED_DIRS = frozenset({'node_modules', '.git', '__pycache__', 'venv'})
+PAGE_CONTENT_CHARS = 3000
+HTML_CHECK_WORKERS = 8
+FEEDBACK_FILES_LISTED = 20
+# Reused across checks so polling a local dev server keeps one connection alive.
+_SESSION = requests.Session()
 
 
 class WebViewer:
@@ -12,13 +26,12 @@ class WebViewer:
         os.makedirs(self.screenshot_dir, exist_ok=True)
 
     def check_url_accessible(self, url: str, timeout: int = 5) -> Tuple[bool, str]:
+        # GET rather than HEAD: some frameworks (FastAPI) answer HEAD on GET routes with 405.
+        # Redirects are not followed, so a 3xx still counts as reachable like it did with curl.
         try:
-            result = subprocess.run(
-                ['curl', '-s', '-o', '/dev/null', '-w', '%{http_code}', '--max-time', str(timeout), url],
-                capture_output=True, text=True, timeout=timeout + 2
-            )
-            status_code = result.stdout.strip()
-            if status_code and status_code.startswith(('2', '3')):
+            with _SESSION.get(url, timeout=timeout, stream=True, allow_redirects=False) as response:
+                status_code = response.status_code
+            if 200 <= status_code < 400:
                 return True, f"URL accessible (HTTP {status_code})"
             return False, f"URL returned HTTP {status_code}"
         except Exception as e:
@@ -26,14 +39,12 @@ class WebViewer:
 
     def get_page_content(self, url: str, timeout: int = 10) -> Tuple[bool, str]:
         try:
-            result = subprocess.run(
-                ['curl', '-s', '--max-time', str(timeout), url],
-                capture_output=True, text=True, timeout=timeout + 2
-            )
-            if result.returncode == 0 and result.stdout:
-                content = result.stdout[:3000]
-                return True, content
-            return False, f"Failed to fetch: {result.stderr}"
+            with _SESSION.get(url, timeout=timeout, stream=True, allow_redirects=False) as response:
+                # Enough bytes for PAGE_CONTENT_CHARS characters of multi-byte text
+                raw = response.raw.read(PAGE_CONTENT_CHARS * 4, decode_content=True)
+            if raw:
+                return True, raw.decode('utf-8', errors='replace')[:PAGE_CONTENT_CHARS]
+            return False, f"Failed to fetch: empty response (HTTP {response.status_code})"
         except Exception as e:
             return False, f"Error fetching URL: {str(e)}"
 
@@ -49,11 +60,16 @@ class WebViewer:
             with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
                 content = f.read()
 
-            has_html = '<html' in content.lower() or '<!doctype' in content.lower()
-            has_head = '<head' in content.lower()
-            has_body = '<body' in content.lower()
-            has_css = '<style' in content.lower() or 'stylesheet' in content.lower()
-            has_js = '<script' in content.lower()
+            found = set()
+            for match in _HTML_MARKERS_RE.finditer(content):
+                found.add(match.group().lower())
+                if len(found) == _HTML_MARKER_COUNT:
+                    break
+            has_html = '<html' in found or '<!doctype' in found
+            has_head = '<head' in found
+            has_body = '<body' in found
+            has_css = '<style' in found or 'stylesheet' in found
+            has_js = '<script' in found
             size = len(content)
 
             issues = []
@@ -83,53 +99,60 @@ class WebViewer:
                 'message': f'Error reading file: {str(e)}'
             }
 
-    def verify_project_files(self, project_dir: str) -> dict:
+    def verify_project_files(self, project_dir: str, max_files: Optional[int] = None) -> dict:
         if not os.path.isdir(project_dir):
             return {
                 'success': False,
                 'message': f'Directory not found: {project_dir}',
-                'files': []
+                'files': [],
+                'html_files': []
             }
 
+        # Counts and flags cover the whole tree; only the first max_files entries are kept.
         files_found = []
+        html_files = []
         issues = []
-
-        for root, dirs, files in os.walk(project_dir):
-            dirs[:] = [d for d in dirs if d not in ('node_modules', '.git', '__pycache__', 'venv')]
-            for fname in files:
-                fpath = os.path.join(root, fname)
-                rel_path = os.path.relpath(fpath, project_dir)
-                size = os.path.getsize(fpath)
+        file_count = 0
+        has_py = has_index = False
+
+        for rel_path, entry in iter_files(project_dir, _SKIPPED_DIRS):
+            file_count += 1
+            size = entry.stat().st_size
+            ext = os.path.splitext(entry.name)[1]
+            if max_files is None or len(files_found) < max_files:
                 files_found.append({
                     'path': rel_path,
                     'size': size,
-                    'type': os.path.splitext(fname)[1]
+                    'type': ext
                 })
-                if size == 0:
-                    issues.append(f"Empty file: {rel_path}")
-
-        has_html = any(f['type'] == '.html' for f in files_found)
-        has_py = any(f['type'] == '.py' for f in files_found)
-        has_index = any('index' in f['path'].lower() for f in files_found)
+            if ext == '.html':
+                html_files.append(rel_path)
+            elif ext == '.py':
+                has_py = True
+            if not has_index and 'index' in rel_path.lower():
+                has_index = True
+            if size == 0:
+                issues.append(f"Empty file: {rel_path}")
 
         return {
-            'success': len(files_found) > 0,
+            'success': file_count > 0,
             'files': files_found,
-            'file_count': len(files_found),
-            'has_html': has_html,
+            'html_files': html_files,
+            'file_count': file_count,
+            'has_html': bool(html_files),
             'has_python': has_py,
             'has_index': has_index,
             'issues': issues,
-            'message': f'Found {len(files_found)} files' + (f', {len(issues)} issues' if issues else '')
+            'message': f'Found {file_count} files' + (f', {len(issues)} issues' if issues else '')
         }
 
     def get_verification_feedback(self, project_dir: str) -> str:
-        result = self.verify_project_files(project_dir)
+        result = self.verify_project_files(project_dir, max_files=FEEDBACK_FILES_LISTED)
         lines = [f"📁 Project Verification: {result['message']}"]
 
         if result['files']:
             lines.append("\nFile yang dibuat:")
-            for f in result['files'][:20]:
+            for f in result['files']:
                 size_str = f"{f['size']}B" if f['size'] < 1024 else f"{f['size']//1024}KB"
                 lines.append(f"  {f['path']} ({size_str})")
 
@@ -138,10 +161,15 @@ class WebViewer:
             for issue in result['issues']:
                 lines.append(f"  - {issue}")
 
-        for f in result['files']:
-            if f['type'] == '.html':
-                html_check = self.verify_html_file(os.path.join(project_dir, f['path']))
-                if not html_check['success']:
-                    lines.append(f"\n🔍 HTML check {f['path']}: {html_check['message']}")
+        html_paths = result['html_files']
+        full_paths = [os.path.join(project_dir, path) for path in html_paths]
+        if len(full_paths) > 1:
+            with ThreadPoolExecutor(max_workers=min(HTML_CHECK_WORKERS, len(full_paths))) as executor:
+                html_checks = list(executor.map(self.verify_html_file, full_paths))
+        else:
+            html_checks = [self.verify_html_file(path) for path in full_paths]
+        for path, html_check in zip(html_paths, html_checks):
+            if not html_check['success']:
+                lines.append(f"\n🔍 HTML check {path}: {html_check['message']}")
 
         return '\n'.join(lines)
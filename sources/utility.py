@@ -1,6 +1,7 @@
 
 from colorama import Fore
 from termcolor import colored
+import os
 import platform
 import threading
 import itertools
@@ -119,6 +120,38 @@ def timer_decorator(func):
         return result
     return wrapper
 
+def iter_files(root, skip_dirs=frozenset(), prefix=""):
+    """
+    Yield (relative_path, DirEntry) for every file under root, in os.walk order.
+    Directories named in skip_dirs, and symlinked directories, are not descended into.
+    Entry types come from the directory listing, so classifying costs no stat call.
+    Directories that cannot be listed (permissions, removed mid-scan) are skipped like os.walk does.
+    """
+    subdirs = []
+    try:
+        entries = os.scandir(root)
+    except OSError:
+        return
+    with entries:
+        while True:
+            try:
+                entry = next(entries)
+            except StopIteration:
+                break
+            except OSError:
+                return
+            try:
+                is_dir = entry.is_dir()
+            except OSError:
+                is_dir = False
+            if is_dir:
+                if entry.name not in skip_dirs and not entry.is_symlink():
+                    subdirs.append(entry)
+            else:
+                yield prefix + entry.name, entry
+    for entry in subdirs:
+        yield from iter_files(entry.path, skip_dirs, prefix + entry.name + os.sep)
+
 if __name__ == "__main__":
     import time
     pretty_print("starting imaginary task", "success")
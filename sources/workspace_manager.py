@@ -2,10 +2,26 @@ import os
 import json
 import uuid
 import shutil
+import atexit
 import datetime
-from typing import Optional, Dict, List
-from dataclasses import dataclass, field, asdict
+import threading
+from functools import lru_cache
+from typing import Optional, Dict, List, Set
+from dataclasses import dataclass, field
 from sources.logger import Logger
+from sources.utility import iter_files
+
+_SKIPPED_DIRS = frozenset({'__pycache__', 'node_modules', '.git', '.cache', '.venv', 'venv'})
+SAVE_DEBOUNCE_SECONDS = 0.5
+
+try:
+    import orjson
+
+    def _encode_sessions(data: Dict) -> bytes:
+        return orjson.dumps(data)
+except ImportError:
+    def _encode_sessions(data: Dict) -> bytes:
+        return json.dumps(data, separators=(",", ":")).encode("utf-8")
 
 
 @dataclass
@@ -19,6 +35,54 @@ class WorkspaceSession:
     ports: Dict[str, int] = field(default_factory=dict)
     status: str = "active"
     metadata: Dict = field(default_factory=dict)
+    _files_set: Set[str] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        self._files_set = set(self.files)
+
+    def add_file(self, rel: str) -> bool:
+        if rel in self._files_set:
+            return False
+        self._files_set.add(rel)
+        self.files.append(rel)
+        return True
+
+    def to_dict(self) -> Dict:
+        data = dict(vars(self))
+        del data['_files_set']
+        data['files'] = list(self.files)
+        data['ports'] = dict(self.ports)
+        data['metadata'] = dict(self.metadata)
+        return data
+
+
+@lru_cache(maxsize=128)
+def _detect_project_type(workspace_path: str, pkg_mtime: Optional[int],
+                         has_requirements: bool, has_gomod: bool, has_html: bool) -> str:
+    if pkg_mtime is not None:
+        pkg = {}
+        try:
+            with open(os.path.join(workspace_path, "package.json"), 'r') as f:
+                pkg = json.load(f)
+        except Exception:
+            pass
+        deps = {**pkg.get("dependencies", {}), **pkg.get("devDependencies", {})}
+        if "next" in deps:
+            return "nextjs"
+        if "react" in deps:
+            return "react"
+        if "vue" in deps:
+            return "vue"
+        if "express" in deps:
+            return "express"
+        return "nodejs"
+    if has_requirements:
+        return "python"
+    if has_gomod:
+        return "golang"
+    if has_html:
+        return "static_html"
+    return "general"
 
 
 class WorkspaceManager:
@@ -28,8 +92,15 @@ class WorkspaceManager:
         self.current_session: Optional[WorkspaceSession] = None
         self.logger = Logger("workspace_manager.log")
         self.sessions_file = os.path.join(base_dir, ".workspace_sessions.json")
+        # _state_lock guards sessions and their file lists so the debounced save thread
+        # snapshots a consistent view; _save_lock serializes the writes themselves.
+        # Never call a save while holding _state_lock.
+        self._state_lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self._save_timer: Optional[threading.Timer] = None
         os.makedirs(base_dir, exist_ok=True)
         self._load_sessions()
+        atexit.register(self.flush)
 
     def _load_sessions(self):
         try:
@@ -42,12 +113,35 @@ class WorkspaceManager:
             self.logger.error(f"Failed to load sessions: {e}")
 
     def _save_sessions(self):
-        try:
-            data = {sid: asdict(s) for sid, s in self.sessions.items()}
-            with open(self.sessions_file, 'w') as f:
-                json.dump(data, f, indent=2)
-        except Exception as e:
-            self.logger.error(f"Failed to save sessions: {e}")
+        with self._save_lock:
+            if self._save_timer is not None:
+                self._save_timer.cancel()
+                self._save_timer = None
+            try:
+                with self._state_lock:
+                    data = {sid: s.to_dict() for sid, s in self.sessions.items()}
+                tmp_file = self.sessions_file + ".tmp"
+                with open(tmp_file, 'wb') as f:
+                    f.write(_encode_sessions(data))
+                os.replace(tmp_file, self.sessions_file)
+                return
+            except Exception as e:
+                self.logger.error(f"Failed to save sessions: {e}")
+        # Keep the change pending so a later attempt writes it instead of dropping it.
+        self._schedule_save()
+
+    def _schedule_save(self):
+        """Coalesce bursts of small mutations (register_file) into one write."""
+        with self._save_lock:
+            if self._save_timer is not None:
+                return
+            self._save_timer = threading.Timer(SAVE_DEBOUNCE_SECONDS, self.flush)
+            self._save_timer.daemon = True
+            self._save_timer.start()
+
+    def flush(self):
+        if self._save_timer is not None:
+            self._save_sessions()
 
     def create_workspace(self, project_name: str = "", project_type: str = "general") -> WorkspaceSession:
         session_id = str(uuid.uuid4())[:8]
@@ -61,7 +155,8 @@ class WorkspaceManager:
             project_type=project_type,
             project_name=project_name or f"project_{session_id}",
         )
-        self.sessions[session_id] = session
+        with self._state_lock:
+            self.sessions[session_id] = session
         self.current_session = session
         self._save_sessions()
         self.logger.info(f"Created workspace: {workspace_path}")
@@ -97,40 +192,45 @@ class WorkspaceManager:
             })
         return result
 
-    def _scan_files(self, directory: str) -> List[str]:
-        files = []
-        skip_dirs = {'__pycache__', 'node_modules', '.git', '.cache', '.venv', 'venv'}
+    def _scan_files(self, directory: str, tree_out: Optional[Dict] = None) -> List[str]:
         if not os.path.isdir(directory):
-            return files
-        for root, dirs, filenames in os.walk(directory):
-            dirs[:] = [d for d in dirs if d not in skip_dirs]
-            for fname in filenames:
-                rel_path = os.path.relpath(os.path.join(root, fname), directory)
-                files.append(rel_path)
+            return []
+        if tree_out is None:
+            return [rel_path for rel_path, _ in iter_files(directory, _SKIPPED_DIRS)]
+        # Fill tree_out during the same walk; each directory's node is looked up once.
+        files = []
+        nodes = {'': tree_out}
+        for rel_path, entry in iter_files(directory, _SKIPPED_DIRS):
+            files.append(rel_path)
+            parent = rel_path[:len(rel_path) - len(entry.name)].rstrip(os.sep)
+            node = nodes.get(parent)
+            if node is None:
+                node = tree_out
+                for part in parent.split(os.sep):
+                    node = node.setdefault(part, {})
+                nodes[parent] = node
+            node[entry.name] = None
         return files
 
     def register_file(self, filepath: str):
         if self.current_session:
-            rel = os.path.relpath(filepath, self.current_session.workspace_path)
-            if rel not in self.current_session.files:
-                self.current_session.files.append(rel)
-                self._save_sessions()
+            prefix = self.current_session.workspace_path.rstrip(os.sep) + os.sep
+            rel = filepath[len(prefix):]
+            # Slicing off the workspace prefix matches relpath for already-normalized paths.
+            if not filepath.startswith(prefix) or os.path.isabs(rel) or os.path.normpath(rel) != rel:
+                rel = os.path.relpath(filepath, self.current_session.workspace_path)
+            with self._state_lock:
+                added = self.current_session.add_file(rel)
+            if added:
+                self._schedule_save()
 
     def get_project_structure(self, session_id: str = None) -> Dict:
         session = self.sessions.get(session_id) if session_id else self.current_session
         if not session:
             return {"error": "No active workspace"}
         
-        files = self._scan_files(session.workspace_path)
         tree = {}
-        for f in files:
-            parts = f.split(os.sep)
-            current = tree
-            for part in parts[:-1]:
-                if part not in current:
-                    current[part] = {}
-                current = current[part]
-            current[parts[-1]] = None
+        files = self._scan_files(session.workspace_path, tree_out=tree)
         
         return {
             "session_id": session.session_id,
@@ -161,7 +261,8 @@ class WorkspaceManager:
         try:
             if os.path.isdir(session.workspace_path):
                 shutil.rmtree(session.workspace_path)
-            session.status = "deleted"
+            with self._state_lock:
+                session.status = "deleted"
             self._save_sessions()
             if self.current_session and self.current_session.session_id == session_id:
                 self.current_session = None
@@ -172,31 +273,20 @@ class WorkspaceManager:
             return False
 
     def detect_project_type(self, workspace_path: str) -> str:
-        if os.path.exists(os.path.join(workspace_path, "package.json")):
-            pkg = {}
-            try:
-                with open(os.path.join(workspace_path, "package.json"), 'r') as f:
-                    pkg = json.load(f)
-            except Exception:
-                pass
-            deps = {**pkg.get("dependencies", {}), **pkg.get("devDependencies", {})}
-            if "next" in deps:
-                return "nextjs"
-            if "react" in deps:
-                return "react"
-            if "vue" in deps:
-                return "vue"
-            if "express" in deps:
-                return "express"
-            return "nodejs"
-        if os.path.exists(os.path.join(workspace_path, "requirements.txt")):
-            return "python"
-        if os.path.exists(os.path.join(workspace_path, "go.mod")):
-            return "golang"
-        html_files = [f for f in os.listdir(workspace_path) if f.endswith('.html')]
-        if html_files:
-            return "static_html"
-        return "general"
+        pkg_mtime = None
+        has_requirements = has_gomod = has_html = False
+        with os.scandir(workspace_path) as entries:
+            for entry in entries:
+                name = entry.name
+                if name == "package.json":
+                    pkg_mtime = entry.stat().st_mtime_ns
+                elif name == "requirements.txt":
+                    has_requirements = True
+                elif name == "go.mod":
+                    has_gomod = True
+                elif name.endswith('.html'):
+                    has_html = True
+        return _detect_project_type(workspace_path, pkg_mtime, has_requirements, has_gomod, has_html)
 
     def get_workspace_stats(self) -> Dict:
         total = len(self.sessions)
@@ -0,0 +1,108 @@
+import unittest
+import asyncio
+import json
+import os
+import sys
+from dataclasses import dataclass
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))  # Add project root to Python path
+from fastapi.websockets import WebSocketState
+from sources.realtime import ConnectionManager, _dumps
+
+
+class FakeWebSocket:
+    def __init__(self):
+        self.scope = {"subprotocols": []}
+        self.query_params = {}
+        self.client_state = WebSocketState.CONNECTED
+        self.frames = []
+
+    async def accept(self, subprotocol=None):
+        pass
+
+    async def send(self, frame):
+        self.frames.append(frame)
+
+
+@dataclass
+class PlanStep:
+    id: int
+    description: str
+
+
+class TestRealtime(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.manager = ConnectionManager()
+        self.ws = FakeWebSocket()
+        await self.manager.connect(self.ws)
+
+    async def asyncTearDown(self):
+        self.manager.disconnect(self.ws)
+
+    async def received(self):
+        await asyncio.sleep(0.1)
+        return [json.loads(frame["text"]) for frame in self.ws.frames]
+
+    async def test_send_helpers_round_trip(self):
+        await self.manager.send_status("planner", "running", 0.5, "details")
+        await self.manager.send_execution_update("python", "print(1)", "1", True)
+        await self.manager.send_file_update("create", "app.py", "x" * 3000)
+        await self.manager.send_plan_update([{"id": 1, "description": "step"}], 1)
+        await self.manager.send_preview_ready("/api/preview/index.html", "static_html")
+        await self.manager.send_peor_update("execute", 1, "details")
+        await self.manager.send_agent_switch("coder", "code_agent")
+        await self.manager.send_agent_thinking("coder", "thinking")
+        await self.manager.send_execution_log("info", "message", "coder")
+        await self.manager.send_plan_progress(3, 1, 0, 2, "step", 1.5, 3.0, 0.33)
+        messages = {msg["type"]: msg for msg in await self.received()}
+        self.assertEqual(set(messages), {
+            "status", "execution", "file_update", "plan", "preview_ready",
+            "peor", "agent_switch", "agent_thinking", "execution_log", "plan_progress",
+        })
+        self.assertEqual(messages["status"]["progress"], 0.5)
+        self.assertEqual(len(messages["file_update"]["content"]), 2000)
+        self.assertEqual(messages["plan_progress"]["success_rate"], 0.33)
+        self.assertIsInstance(messages["agent_switch"]["timestamp"], int)
+
+    async def test_buffered_events_keep_send_order(self):
+        await self.manager.send_status("planner", "starting")
+        await self.manager.send_agent_switch("coder", "code_agent")
+        await self.manager.send_status("planner", "running")
+        await self.manager.send_peor_update("observe", 1, "Success: True")
+        await self.manager.send_peor_update("reflect", 1, "Analyzing result")
+        messages = await self.received()
+        self.assertEqual(
+            [(m["type"], m.get("status") or m.get("phase")) for m in messages],
+            [("agent_switch", None), ("status", "running"), ("peor", "observe"), ("peor", "reflect")],
+        )
+
+    async def test_plan_with_objects_is_serialized(self):
+        await self.manager.send_plan_update([PlanStep(1, "step")], 1)
+        messages = await self.received()
+        self.assertEqual(messages[0]["plan"], [{"id": 1, "description": "step"}])
+
+    async def test_topic_filtered_client_only_gets_subscribed_events(self):
+        filtered = FakeWebSocket()
+        filtered.query_params = {"topics": "status"}
+        await self.manager.connect(filtered)
+        await self.manager.send_status("planner", "running")
+        await self.manager.send_agent_switch("coder", "code_agent")
+        await asyncio.sleep(0.1)
+        self.assertEqual([json.loads(f["text"])["type"] for f in filtered.frames], ["status"])
+        self.assertEqual(len(await self.received()), 2)
+        self.manager.disconnect(filtered)
+
+    async def test_unknown_topics_are_ignored_and_empty_topics_dropped(self):
+        filtered = FakeWebSocket()
+        filtered.query_params = {"topics": "status,bogus"}
+        await self.manager.connect(filtered)
+        self.assertEqual(set(self.manager._subs), {"status"})
+        self.manager.disconnect(filtered)
+        self.assertEqual(self.manager._subs, {})
+
+    def test_dumps_handles_sets(self):
+        self.assertEqual(json.loads(_dumps({"tags": {"a"}})), {"tags": ["a"]})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+import unittest
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))  # Add project root to Python path
+from sources.sandbox import SafeExecutor
+
+
+class TestPythonValidation(unittest.TestCase):
+    def setUp(self):
+        self.work_dir = tempfile.mkdtemp()
+        self.executor = SafeExecutor(work_dir=self.work_dir)
+
+    def assertBlocked(self, code, name):
+        is_safe, reason = self.executor.validate_python(code)
+        self.assertFalse(is_safe)
+        self.assertIn(name, reason)
+
+    def test_blocks_direct_and_aliased_calls(self):
+        self.assertBlocked('import os\nos.system("ls")', 'os.system')
+        self.assertBlocked('import os as o\no.system("ls")', 'os.system')
+        self.assertBlocked('from os import system as s\ns("ls")', 'os.system')
+        self.assertBlocked('import subprocess\nsubprocess.run(["ls"])', 'subprocess.run')
+
+    def test_blocks_getattr_lookups(self):
+        self.assertBlocked('import os\ngetattr(os, "system")("ls")', 'os.system')
+        self.assertBlocked('getattr(__import__("os"), "system")("ls")', '__import__')
+
+    def test_allows_mentions_and_methods(self):
+        self.assertEqual(self.executor.validate_python('print("os.system is dangerous")'), (True, ""))
+        self.assertEqual(self.executor.validate_python('"a,b".split(",")'), (True, ""))
+        self.assertEqual(self.executor.validate_python('open("data.txt").read()'), (True, ""))
+
+    def test_blocks_builtins_module_access(self):
+        self.assertBlocked('__builtins__.__import__("os").system("id")', '__import__')
+        self.assertBlocked('getattr(__builtins__, "__import__")("os").system("id")', '__import__')
+
+    def test_blocks_forbidden_names_on_any_object(self):
+        self.assertBlocked('b = __builtins__; b.exec("print(1)")', 'exec')
+
+    def test_blocks_open_of_etc_paths(self):
+        self.assertBlocked('open("/etc/" + "passwd").read()', 'open(')
+
+    def test_allows_open_of_variable_paths_and_dict_keys(self):
+        self.assertEqual(self.executor.validate_python('with open(path) as f:\n    print(f.read())'), (True, ""))
+        self.assertEqual(self.executor.validate_python('for name in files:\n    open(name, "w")'), (True, ""))
+        self.assertEqual(self.executor.validate_python('cfg = {}\nprint(cfg["exec"])'), (True, ""))
+
+    def test_unparsable_code_falls_back_to_patterns(self):
+        self.assertBlocked('os.system("ls"\n', 'os.system')
+
+
+class TestPythonExecution(unittest.TestCase):
+    def setUp(self):
+        self.work_dir = tempfile.mkdtemp()
+        self.executor = SafeExecutor(work_dir=self.work_dir)
+
+    def test_snippet_runs_as_main_script(self):
+        result = self.executor.execute_python('print(__name__, __file__)')
+        self.assertTrue(result.success, result.errors)
+        self.assertEqual(result.output.strip(), '__main__ <stdin>')
+
+    def test_snippet_classes_pickle(self):
+        code = 'import pickle\nclass A:\n    pass\nprint(len(pickle.dumps(A())) > 0)'
+        result = self.executor.execute_python(code)
+        self.assertTrue(result.success, result.errors)
+        self.assertEqual(result.output.strip(), 'True')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,46 @@
+import unittest
+import os
+import sys
+import shutil
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))  # Add project root to Python path
+from sources.utility import iter_files
+
+
+class TestIterFiles(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root, ignore_errors=True)
+        for rel in ('a.txt', os.path.join('sub', 'b.txt'), os.path.join('skip', 'c.txt')):
+            path = os.path.join(self.root, rel)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'w') as f:
+                f.write('x')
+
+    def test_matches_os_walk(self):
+        expected = sorted(
+            os.path.relpath(os.path.join(dirpath, name), self.root)
+            for dirpath, dirnames, filenames in os.walk(self.root)
+            for name in filenames
+            if 'skip' not in dirpath
+        )
+        found = sorted(rel for rel, _ in iter_files(self.root, frozenset({'skip'})))
+        self.assertEqual(found, expected)
+
+    def test_skips_directory_removed_during_scan(self):
+        files = iter_files(self.root, frozenset({'skip'}))
+        self.assertEqual(next(files)[0], 'a.txt')
+        shutil.rmtree(os.path.join(self.root, 'sub'))
+        self.assertEqual(list(files), [])
+
+    @unittest.skipIf(os.name == 'nt' or os.geteuid() == 0, "needs POSIX permissions as a non-root user")
+    def test_skips_unreadable_directory(self):
+        locked = os.path.join(self.root, 'sub')
+        os.chmod(locked, 0o000)
+        self.addCleanup(os.chmod, locked, 0o700)
+        self.assertEqual([rel for rel, _ in iter_files(self.root, frozenset({'skip'}))], ['a.txt'])
+
+
+if __name__ == '__main__':
+    unittest.main()
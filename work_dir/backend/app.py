@@ -1,69 +1,84 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify
 from flask_cors import CORS
 import sqlite3
+import threading
 import os
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 app = Flask(__name__)
 CORS(app)
 
 DB_PATH = "drama.db"
 
+# One connection for the whole app instead of reopening the database per request.
+# It is shared across Flask's worker threads, so every use goes through _DB_LOCK.
+_CONN = sqlite3.connect(DB_PATH, check_same_thread=False, isolation_level=None)
+_CONN.execute("PRAGMA journal_mode=WAL")
+_CONN.execute("PRAGMA synchronous=NORMAL")
+_CONN.row_factory = sqlite3.Row
+_DB_LOCK = threading.Lock()
+
 def init_db():
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute("""
-        CREATE TABLE IF NOT EXISTS dramas (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            title TEXT NOT NULL,
-            year INTEGER,
-            genre TEXT,
-            description TEXT,
-            poster TEXT
-        )
-    """)
-    conn.commit()
-    conn.close()
+    with _DB_LOCK:
+        _CONN.execute("""
+            CREATE TABLE IF NOT EXISTS dramas (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                title TEXT NOT NULL,
+                year INTEGER,
+                genre TEXT,
+                description TEXT,
+                poster TEXT
+            )
+        """)
 
 init_db()
 
+def _json(obj):
+    if orjson is None:
+        return jsonify(obj)
+    return Response(orjson.dumps(obj), mimetype="application/json")
+
 @app.get("/api/dramas")
 def get_dramas():
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute("SELECT * FROM dramas")
-    rows = c.fetchall()
-    conn.close()
+    with _DB_LOCK:
+        rows = _CONN.execute("SELECT * FROM dramas").fetchall()
 
-    dramas = []
-    for r in rows:
-        dramas.append({
-            "id": r[0],
-            "title": r[1],
-            "year": r[2],
-            "genre": r[3],
-            "description": r[4],
-            "poster": r[5]
-        })
-    return jsonify(dramas)
+    return _json([dict(r) for r in rows])
+
+# Same SQL text every time so sqlite3's per-connection statement cache reuses the prepared plan.
+_INSERT_DRAMA = """
+    INSERT INTO dramas (title, year, genre, description, poster)
+    VALUES (?, ?, ?, ?, ?)
+"""
+
+def _drama_row(data):
+    return (data["title"], data["year"], data["genre"], data["description"], data["poster"])
 
 @app.post("/api/dramas")
 def add_drama():
     data = request.json
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute("""
-        INSERT INTO dramas (title, year, genre, description, poster)
-        VALUES (?, ?, ?, ?, ?)
-    """, (data["title"], data["year"], data["genre"], data["description"], data["poster"]))
-    conn.commit()
-    conn.close()
+    if isinstance(data, list):
+        rows = [_drama_row(d) for d in data]
+        with _DB_LOCK:
+            _CONN.execute("BEGIN IMMEDIATE")
+            try:
+                _CONN.executemany(_INSERT_DRAMA, rows)
+            except Exception:
+                _CONN.execute("ROLLBACK")
+                raise
+            _CONN.execute("COMMIT")
+        return jsonify({"message": f"{len(rows)} dramas added"}), 201
+
+    with _DB_LOCK:
+        _CONN.execute(_INSERT_DRAMA, _drama_row(data))
     return jsonify({"message": "Drama added"}), 201
 
 @app.delete("/api/dramas/<int:id>")
 def delete_drama(id):
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute("DELETE FROM dramas WHERE id=?", (id,))
-    conn.commit()
-    conn.close()
+    with _DB_LOCK:
+        _CONN.execute("DELETE FROM dramas WHERE id=?", (id,))
     return jsonify({"message": "Drama deleted"})